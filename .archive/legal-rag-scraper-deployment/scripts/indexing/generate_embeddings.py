@@ -7,11 +7,23 @@ Uses Azure SDK with Azure Identity authentication.
 import os
 import sys
 import json
+import logging
 import time
 import argparse
+import asyncio
+import fnmatch
 import glob
+import hashlib
+import sqlite3
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
 from dotenv import load_dotenv
+import ijson
+import numpy as np
+import orjson
 
 # Add project root to path and load environment variables FIRST
 project_root = Path(__file__).parents[2]
@@ -22,15 +34,27 @@ env_path = project_root / '.env'
 print(f"🔎 Loading environment from: {env_path}")
 load_dotenv(env_path, override=True)
 
+# Per-document messages are DEBUG so large runs only pay for one INFO summary
+# per file; set LOG_LEVEL=DEBUG to see them.
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)],
+    force=True,
+)
+logger = logging.getLogger(__name__)
+
 # Azure SDK imports
 try:
-    from azure.identity import DefaultAzureCredential, AzureCliCredential, ChainedTokenCredential
+    from azure.identity import DefaultAzureCredential, AzureCliCredential, ChainedTokenCredential, get_bearer_token_provider
     from azure.core.credentials import AzureKeyCredential
-    from openai import AzureOpenAI
+    from openai import AsyncAzureOpenAI, BadRequestError, RateLimitError
+    import tiktoken
+    from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
 except ImportError as e:
     print(f"ERROR: Missing required Azure SDK packages: {e}")
     print("\nPlease install the required packages:")
-    print("pip install azure-identity azure-core openai")
+    print("pip install azure-identity azure-core openai tiktoken tenacity")
     sys.exit(1)
 
 # Get configuration from environment variables
@@ -42,12 +66,46 @@ openai_api_version = os.getenv("AZURE_OPENAI_EMBEDDING_API_VERSION", "2024-06-01
 # For text-embedding-3-large, use 3072 dimensions for maximum precision
 embedding_dimensions = int(os.getenv("AZURE_OPENAI_EMBEDDING_DIMENSIONS", "3072"))  # Updated default for text-embedding-3-large
 
+# Token scope for Azure OpenAI / Azure AI Services with Microsoft Entra ID
+COGNITIVE_SERVICES_SCOPE = "https://cognitiveservices.azure.com/.default"
+
+# Hosts accepted for AZURE_OPENAI_ENDPOINT (compared after stripping trailing slashes)
+VALID_ENDPOINT_SUFFIXES = ('.openai.azure.com', '.cognitiveservices.azure.com')
+
+# Batching: Azure OpenAI accepts up to 2048 inputs per embeddings request, but
+# large batches of long legal chunks can exceed the per-request token limit.
+embedding_batch_size = int(os.getenv("AZURE_OPENAI_EMBEDDING_BATCH_SIZE", "64"))
+embedding_batch_max_tokens = int(os.getenv("AZURE_OPENAI_EMBEDDING_BATCH_MAX_TOKENS", "100000"))
+# Batches are sent concurrently, bounded to stay under the deployment's rate limit
+embedding_max_concurrency = int(os.getenv("AZURE_OPENAI_EMBEDDING_MAX_CONCURRENCY", "8"))
+
+# orjson writes UTF-8 directly (like ensure_ascii=False) and serializes numpy arrays natively
+JSON_WRITE_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+
+# Fallback content field names (for backward compatibility), in priority order
+CONTENT_FIELDS = (
+    'chunk', 'chunk_content', 'text', 'body',
+    'description', 'summary', 'paragraph_text', 'section_content'
+)
+CONTENT_FIELD_SET = frozenset(CONTENT_FIELDS)
+
+# Metadata every legal document needs for a useful embedding
+LEGAL_REQUIRED_FIELDS = ('id', 'content', 'category', 'sourcepage')
+
+# Supported --embedding-dtype values; anything but float32 is stored in a sidecar file
+EMBEDDING_DTYPES = ("float32", "float16", "bfloat16")
+
+# Content-addressed cache so identical chunks are only ever embedded once
+EMBEDDING_CACHE_FILE = project_root / "data" / "cache" / "embeddings.db"
+
 # Validate configuration
 print(f"🔎 Configuration loaded:")
 print(f"   Endpoint: {openai_endpoint}")
 print(f"   Deployment: {openai_deployment}")
 print(f"   API Version: {openai_api_version}")
 print(f"   Embedding Dimensions: {embedding_dimensions}")
+print(f"   Batch Size: {embedding_batch_size} inputs / {embedding_batch_max_tokens} tokens")
+print(f"   Max Concurrent Requests: {embedding_max_concurrency}")
 
 if not openai_endpoint:
     print("❌ AZURE_OPENAI_ENDPOINT not found in environment")
@@ -56,18 +114,23 @@ if not openai_deployment:
     print("❌ AZURE_OPENAI_EMBEDDING_DEPLOYMENT not found in environment")
     sys.exit(1)
 
-# Validate endpoint format - handle both Azure OpenAI and Azure AI Services
-if not (openai_endpoint.endswith('.openai.azure.com') or openai_endpoint.endswith('.cognitiveservices.azure.com/')):
+# Validate endpoint format - handle both Azure OpenAI and Azure AI Services,
+# with or without a trailing slash
+openai_endpoint = openai_endpoint.rstrip('/')
+if not openai_endpoint.endswith(VALID_ENDPOINT_SUFFIXES):
     print(f"❌ Invalid endpoint format: {openai_endpoint}")
-    print("   Should end with '.openai.azure.com' or '.cognitiveservices.azure.com/'")
+    print("   Should end with '.openai.azure.com' or '.cognitiveservices.azure.com'")
     sys.exit(1)
 
-def get_openai_client():
+def get_openai_client_kwargs():
     """
-    Get Azure OpenAI client using Azure Identity with fallback to API key.
+    Resolve Azure OpenAI client settings using Azure Identity with fallback to API key.
+    
+    Azure Identity is verified by fetching a token, which needs no billable
+    embeddings call; API key problems surface on the first real request.
     
     Returns:
-        AzureOpenAI: Configured client instance
+        dict: Keyword arguments for AsyncAzureOpenAI
     """
     # Try Azure Identity first (recommended approach)
     try:
@@ -76,23 +139,17 @@ def get_openai_client():
             DefaultAzureCredential(),
             AzureCliCredential()
         )
+        token_provider = get_bearer_token_provider(credential, COGNITIVE_SERVICES_SCOPE)
         
-        # Test the credential by creating a client
-        client = AzureOpenAI(
-            azure_endpoint=openai_endpoint,
-            azure_ad_token_provider=credential,
-            api_version=openai_api_version
-        )
-        
-        # Test the client with a simple call
-        test_response = client.embeddings.create(
-            input=["test"],
-            model=openai_deployment,
-            dimensions=embedding_dimensions
-        )
+        # Fails fast if no credential in the chain can authenticate
+        token_provider()
         
         print(f"✅ Successfully authenticated with Azure OpenAI using Azure Identity")
-        return client
+        return {
+            "azure_endpoint": openai_endpoint,
+            "azure_ad_token_provider": token_provider,
+            "api_version": openai_api_version,
+        }
         
     except Exception as e:
         print(f"⚠️ Azure Identity authentication failed: {str(e)}")
@@ -102,98 +159,328 @@ def get_openai_client():
         if not openai_key:
             raise ValueError("No valid authentication method available. Please configure Azure Identity or provide AZURE_OPENAI_KEY.")
         
-        try:
-            client = AzureOpenAI(
-                azure_endpoint=openai_endpoint,
-                api_key=openai_key,
-                api_version=openai_api_version
-            )
-            
-            # Test the client
-            test_response = client.embeddings.create(
-                input=["test"],
-                model=openai_deployment,
-                dimensions=embedding_dimensions
+        print(f"✅ Using API key authentication with Azure OpenAI")
+        return {
+            "azure_endpoint": openai_endpoint,
+            "api_key": openai_key,
+            "api_version": openai_api_version,
+        }
+
+# Resolved lazily so worker processes never authenticate at import time
+openai_client_kwargs = None
+
+def init_openai_client():
+    """Resolve and validate Azure OpenAI authentication, exiting with guidance on failure."""
+    global openai_client_kwargs
+    if openai_client_kwargs is not None:
+        return
+    try:
+        openai_client_kwargs = get_openai_client_kwargs()
+        print(f"✅ Azure OpenAI client initialized successfully")
+        print(f"   Using endpoint: {openai_endpoint}")
+        print(f"   Using deployment: {openai_deployment}")
+    except Exception as e:
+        print(f"❌ Failed to initialize Azure OpenAI client: {e}")
+        print("\nPlease ensure you have either:")
+        print("1. Azure CLI logged in: az login")
+        print("2. Valid API key in environment variable AZURE_OPENAI_KEY")
+        print("3. Managed identity configured (if running in Azure)")
+        sys.exit(1)
+
+def get_async_openai_client():
+    """Create an AsyncAzureOpenAI client with the validated authentication settings."""
+    global openai_client_kwargs
+    if openai_client_kwargs is None:
+        openai_client_kwargs = get_openai_client_kwargs()
+    return AsyncAzureOpenAI(**openai_client_kwargs)
+
+class EmbeddingCache:
+    """
+    On-disk embedding cache backed by SQLite.
+
+    Entries are keyed by a BLAKE2b digest of the deployment, dimensions and
+    input text, so a changed model or dimension never returns a stale vector.
+    Vectors are stored as raw float32 bytes.
+
+    The cache also keeps a manifest of files whose documents were all
+    embedded, keyed by path with their mtime and size (and those of the
+    embedding sidecar, for quantized dtypes), so unchanged files can be
+    skipped without being opened.
+    """
+
+    # SQLite limits the number of bound parameters per statement
+    LOOKUP_CHUNK_SIZE = 500
+
+    def __init__(self, path=EMBEDDING_CACHE_FILE):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path), timeout=30)
+        # WAL lets parallel worker processes read while another one writes
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vec BLOB NOT NULL)")
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(files)")}
+        if columns and "sidecar_mtime_ns" not in columns:
+            # Entries written before sidecars were tracked can't vouch for them
+            self.conn.execute("DROP TABLE files")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS files "
+            "(path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, signature TEXT NOT NULL, "
+            "sidecar_mtime_ns INTEGER, sidecar_size INTEGER)"
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(text):
+        """Build the cache key for a text under the current deployment and dimensions."""
+        payload = f"{openai_deployment}|{embedding_dimensions}|{text}".encode("utf-8")
+        return hashlib.blake2b(payload, digest_size=32).digest()
+
+    def get_many(self, keys):
+        """Return a dict of key -> embedding for every key present in the cache."""
+        found = {}
+        keys = list(keys)
+        for start in range(0, len(keys), self.LOOKUP_CHUNK_SIZE):
+            chunk = keys[start:start + self.LOOKUP_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(f"SELECT key, vec FROM embeddings WHERE key IN ({placeholders})", chunk)
+            for key, vec in rows:
+                found[key] = np.frombuffer(vec, dtype=np.float32)
+        return found
+
+    def put_many(self, items):
+        """Store (key, embedding) pairs in a single transaction."""
+        rows = [(key, np.asarray(vec, dtype=np.float32).tobytes()) for key, vec in items if vec is not None]
+        if not rows:
+            return
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO embeddings (key, vec) VALUES (?, ?)", rows)
+
+    @staticmethod
+    def file_signature(embedding_dtype):
+        """Settings that must match for a file's embeddings to still be valid."""
+        return f"{openai_deployment}|{embedding_dimensions}|{embedding_dtype}"
+
+    @staticmethod
+    def file_state(file_path, embedding_dtype):
+        """
+        mtime and size of the file and, for quantized dtypes, of its sidecar.
+        A missing sidecar reads as (None, None), which never matches a
+        completed entry.
+        """
+        stat = os.stat(file_path)
+        sidecar_state = (None, None)
+        if embedding_dtype != "float32":
+            sidecar_path = get_sidecar_path(file_path)
+            if sidecar_path.exists():
+                sidecar_stat = sidecar_path.stat()
+                sidecar_state = (sidecar_stat.st_mtime_ns, sidecar_stat.st_size)
+        return (stat.st_mtime_ns, stat.st_size) + sidecar_state
+
+    def is_file_complete(self, file_path, embedding_dtype):
+        """True if the file (and its sidecar) is unchanged since a run that left every document embedded."""
+        state = self.file_state(file_path, embedding_dtype)
+        if embedding_dtype != "float32" and state[2] is None:
+            return False
+        row = self.conn.execute(
+            "SELECT mtime_ns, size, sidecar_mtime_ns, sidecar_size, signature FROM files WHERE path = ?",
+            (os.path.abspath(file_path),)
+        ).fetchone()
+        return row == state + (self.file_signature(embedding_dtype),)
+
+    def mark_file_complete(self, file_path, embedding_dtype):
+        """Record that every document in the file, as it is now on disk, has an embedding."""
+        state = self.file_state(file_path, embedding_dtype)
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO files (path, mtime_ns, size, sidecar_mtime_ns, sidecar_size, signature) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (os.path.abspath(file_path),) + state + (self.file_signature(embedding_dtype),),
             )
-            
-            print(f"✅ Successfully authenticated with Azure OpenAI using API key")
-            return client
-            
-        except Exception as e:
-            print(f"❌ API key authentication also failed: {e}")
-            raise
 
-# Initialize Azure OpenAI client
-try:
-    client = get_openai_client()
-    print(f"✅ Azure OpenAI client initialized successfully")
-    print(f"   Using endpoint: {openai_endpoint}")
-    print(f"   Using deployment: {openai_deployment}")
-except Exception as e:
-    print(f"❌ Failed to initialize Azure OpenAI client: {e}")
-    print("\nPlease ensure you have either:")
-    print("1. Azure CLI logged in: az login")
-    print("2. Valid API key in environment variable AZURE_OPENAI_KEY")
-    print("3. Managed identity configured (if running in Azure)")
-    sys.exit(1)
+    def close(self):
+        self.conn.close()
+
+def has_valid_embedding(doc):
+    """True if the document carries an embedding (list or array) of the configured size."""
+    embedding = doc.get("embedding")
+    return isinstance(embedding, (list, np.ndarray)) and len(embedding) == embedding_dimensions
 
-def generate(text):
-    """Generate embeddings for the given text using Azure OpenAI."""
-    if not text or not text.strip():
+def get_sidecar_path(file_path):
+    """Path of the compressed embedding sidecar for a JSON file (e.g. Part 1.embeddings.npz)."""
+    return Path(file_path).with_suffix(".embeddings.npz")
+
+def encode_sidecar_embedding(embedding, dtype):
+    """
+    Quantize an embedding for sidecar storage.
+
+    numpy has no bfloat16 dtype, so bfloat16 vectors are stored as the upper
+    16 bits of each float32 (rounded to nearest even) in a uint16 array.
+    """
+    arr = np.asarray(embedding, dtype=np.float32)
+    if dtype == "float16":
+        return arr.astype(np.float16)
+    bits = arr.view(np.uint32)
+    return ((bits + 0x7FFF + ((bits >> 16) & 1)) >> 16).astype(np.uint16)
+
+def load_sidecar(file_path):
+    """Load every array from a file's embedding sidecar, or {} if there is none."""
+    sidecar_path = get_sidecar_path(file_path)
+    if not sidecar_path.exists():
+        return {}
+    with np.load(sidecar_path) as npz:
+        return {key: npz[key] for key in npz.files}
+
+def save_sidecar(file_path, arrays):
+    """Atomically write a file's embedding sidecar."""
+    sidecar_path = get_sidecar_path(file_path)
+    tmp_path = sidecar_path.with_name(sidecar_path.name + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        np.savez_compressed(f, **arrays)
+    os.replace(tmp_path, sidecar_path)
+
+def move_embedding_to_sidecar(doc, file_path, dtype, existing, arrays):
+    """
+    Move a document's embedding into the sidecar ``arrays`` and leave an
+    ``embedding_ref`` in its place. Documents already stored in the
+    ``existing`` sidecar are carried over unchanged.
+
+    Returns:
+        bool: True if the document itself was modified
+    """
+    doc_id = doc.get('id')
+    if not doc_id:
+        return False
+
+    if has_valid_embedding(doc):
+        arrays[doc_id] = encode_sidecar_embedding(doc["embedding"], dtype)
+        del doc["embedding"]
+        doc["embedding_ref"] = f"{get_sidecar_path(file_path).name}#{doc_id}"
+        return True
+
+    if doc.get("embedding_ref") and doc_id in existing:
+        arrays[doc_id] = existing[doc_id]
+    return False
+
+@lru_cache(maxsize=1)
+def get_tokenizer():
+    """Get the tiktoken encoding for the embedding deployment (cl100k_base fallback)."""
+    try:
+        return tiktoken.encoding_for_model(openai_deployment)
+    except KeyError:
+        # Deployment names don't always match model names
+        return tiktoken.get_encoding("cl100k_base")
+
+def count_tokens(text):
+    """Count the tokens the embedding model will see for the given text."""
+    return len(get_tokenizer().encode(text, disallowed_special=()))
+
+def iter_batches(items, max_items=None, max_tokens=None):
+    """
+    Group (key, text) pairs into batches for the embeddings API.
+
+    Each batch holds at most ``max_items`` inputs and at most ``max_tokens``
+    tokens in total, so a batch never trips the per-request limits.
+    """
+    max_items = max_items or embedding_batch_size
+    max_tokens = max_tokens or embedding_batch_max_tokens
+
+    batch = []
+    batch_tokens = 0
+    for key, text in items:
+        tokens = count_tokens(text)
+        if batch and (len(batch) >= max_items or batch_tokens + tokens > max_tokens):
+            yield batch
+            batch = []
+            batch_tokens = 0
+        batch.append((key, text))
+        batch_tokens += tokens
+    if batch:
+        yield batch
+
+@retry(
+    retry=retry_if_exception_type(RateLimitError),
+    wait=wait_exponential_jitter(initial=1, max=60),
+    stop=stop_after_attempt(6),
+    reraise=True,
+)
+async def request_embeddings(client, texts):
+    """Send one embeddings request, backing off and retrying on HTTP 429."""
+    resp = await client.embeddings.create(
+        input=texts,
+        model=openai_deployment,
+        dimensions=embedding_dimensions  # This controls output vector size
+    )
+    embeddings = [None] * len(texts)
+    for item in resp.data:
+        embeddings[item.index] = np.asarray(item.embedding, dtype=np.float32)
+    return embeddings
+
+async def generate_batch(client, texts, semaphore):
+    """
+    Generate embeddings for a list of texts in a single Azure OpenAI request.
+
+    Returns a list of float32 arrays aligned with ``texts``; an entry is None
+    when no embedding could be generated for that text. If the service rejects the
+    batch as too large, it is split in half and retried. ``semaphore`` bounds
+    the number of requests in flight.
+    """
+    if not texts:
         return []
-    
+
     try:
-        resp = client.embeddings.create(
-            input=[text], 
-            model=openai_deployment,
-            dimensions=embedding_dimensions  # This controls output vector size
-        )
-        return resp.data[0].embedding if resp.data else []
+        async with semaphore:
+            return await request_embeddings(client, texts)
+    except BadRequestError as e:
+        if len(texts) > 1:
+            mid = len(texts) // 2
+            logger.debug("  ⚠ Batch of %d inputs rejected (%s), splitting and retrying", len(texts), e)
+            first, second = await asyncio.gather(
+                generate_batch(client, texts[:mid], semaphore),
+                generate_batch(client, texts[mid:], semaphore),
+            )
+            return first + second
+        logger.warning("  ⚠ Error generating embedding: %s", e)
+        return [None]
     except Exception as e:
-        print(f"  ⚠ Error generating embedding: {e}")
-        print(f"  ⚠ Using endpoint: {openai_endpoint}")
-        print(f"  ⚠ Using deployment: {openai_deployment}")
-        print(f"  ⚠ Using dimensions: {embedding_dimensions}")
-        print("  ⚠ Verify deployment exists in Azure OpenAI Studio")
-        return []
+        logger.warning("  ⚠ Error generating embeddings for batch of %d: %s", len(texts), e)
+        logger.warning("  ⚠ Using endpoint: %s, deployment: %s, dimensions: %d",
+                       openai_endpoint, openai_deployment, embedding_dimensions)
+        logger.warning("  ⚠ Verify deployment exists in Azure OpenAI Studio")
+        return [None] * len(texts)
 
 def extract_content_from_document(doc):
     """
     Extract content from a document optimized for legal documents.
     """
     # Primary content field for legal documents
-    if 'content' in doc and doc['content']:
-        content = str(doc['content']).strip()
+    content = doc.get('content')
+    if content:
+        content = str(content).strip()
         if content:
-            # For legal documents, enhance content with metadata for better embeddings
-            enhanced_content = content
-            
-            # Add legal context from metadata
-            if doc.get('category'):
-                enhanced_content = f"Legal Category: {doc['category']}\n\n{enhanced_content}"
-            
+            # For legal documents, enhance content with metadata for better embeddings.
+            # The prefix is built separately so the content is copied only once.
+            prefix_parts = []
             if doc.get('sourcepage'):
-                enhanced_content = f"Section: {doc['sourcepage']}\n\n{enhanced_content}"
+                prefix_parts.append(f"Section: {doc['sourcepage']}\n\n")
+            if doc.get('category'):
+                prefix_parts.append(f"Legal Category: {doc['category']}\n\n")
             
-            return enhanced_content, 'content_enhanced'
+            return "".join(prefix_parts) + content, 'content_enhanced'
     
     # Fallback content field names (for backward compatibility)
-    content_fields = [
-        'chunk', 'chunk_content', 'text', 'body', 
-        'description', 'summary', 'paragraph_text', 'section_content'
-    ]
-    
-    for field in content_fields:
-        if field in doc and doc[field]:
-            content = str(doc[field]).strip()
+    for field in CONTENT_FIELDS:
+        value = doc.get(field)
+        if value:
+            content = str(value).strip()
             if content:
                 return content, field
     
     # Try nested structures
-    if 'text' in doc and isinstance(doc['text'], dict):
-        for field in content_fields:
-            if field in doc['text'] and doc['text'][field]:
-                content = str(doc['text'][field]).strip()
+    nested = doc.get('text')
+    if isinstance(nested, dict):
+        for field in CONTENT_FIELDS:
+            value = nested.get(field)
+            if value:
+                content = str(value).strip()
                 if content:
                     return content, f"text.{field}"
     
@@ -207,10 +494,13 @@ def extract_content_from_document(doc):
             return combined, 'title+sourcefile'
         return title, 'title'
     
-    # Last resort: try to find any text-like field
+    # Last resort: try to find any text-like field not already checked above
     for key, value in doc.items():
-        if isinstance(value, str) and len(value.strip()) > 10:
-            return value.strip(), key
+        if key in CONTENT_FIELD_SET or not isinstance(value, str):
+            continue
+        value = value.strip()
+        if len(value) > 10:
+            return value, key
     
     return None, None
 
@@ -230,11 +520,11 @@ def flatten_content_chunks(doc):
     
     content_chunks = doc.get('content_chunks', [])
     if not isinstance(content_chunks, list):
-        print(f"  ⚠ content_chunks is not a list in document {doc.get('id', 'unknown')}")
+        logger.debug("  ⚠ content_chunks is not a list in document %s", doc.get('id', 'unknown'))
         return [doc]
     
     if not content_chunks:
-        print(f"  ⚠ Empty content_chunks array in document {doc.get('id', 'unknown')}")
+        logger.debug("  ⚠ Empty content_chunks array in document %s", doc.get('id', 'unknown'))
         return [doc]
     
     flattened_docs = []
@@ -247,37 +537,34 @@ def flatten_content_chunks(doc):
             if not chunk_content:
                 continue  # Skip empty chunks
                 
-            # Create a new document for this chunk
-            chunk_doc = base_metadata.copy()
-            chunk_doc['chunk'] = chunk_content  # Primary content field
-            chunk_doc['content'] = chunk_content  # Alternative content field
-            chunk_doc['chunk_content'] = chunk_content  # Another alternative
-            
-            # Generate a unique ID for this chunk
+            # Build each chunk document in one allocation; 'content' is the
+            # canonical text field read by extract_content_from_document and
+            # the upload script
             parent_id = doc.get('id', f'unknown_{i}')
-            chunk_doc['id'] = f"{parent_id}_chunk_{i}"
-            chunk_doc['parent_id'] = parent_id
-            chunk_doc['chunk_id'] = f'chunk_{i}'
-            
-            flattened_docs.append(chunk_doc)
+            flattened_docs.append({
+                **base_metadata,
+                'content': chunk_content,
+                'id': f"{parent_id}_chunk_{i}",
+                'parent_id': parent_id,
+                'chunk_id': f'chunk_{i}',
+            })
             
         elif isinstance(chunk, dict):
             # Handle dictionary chunks (fallback for other data structures)
-            chunk_doc = base_metadata.copy()
-            chunk_doc.update(chunk)
-            
-            # Generate a unique ID for this chunk
             parent_id = doc.get('id', f'unknown_{i}')
             chunk_id = chunk.get('chunk_id', f'chunk_{i}')
-            chunk_doc['id'] = f"{parent_id}_{chunk_id}"
-            chunk_doc['parent_id'] = parent_id
-            chunk_doc['chunk_id'] = chunk_id
-            
-            flattened_docs.append(chunk_doc)
+            flattened_docs.append({
+                **base_metadata,
+                **chunk,
+                'id': f"{parent_id}_{chunk_id}",
+                'parent_id': parent_id,
+                'chunk_id': chunk_id,
+            })
         else:
-            print(f"  ⚠ Unexpected chunk type in {doc.get('id', 'unknown')}: {type(chunk)}")
+            logger.debug("  ⚠ Unexpected chunk type in %s: %s", doc.get('id', 'unknown'), type(chunk))
     
-    print(f"  📄 Flattened {len(content_chunks)} chunks from document {doc.get('id', 'unknown')} -> {len(flattened_docs)} valid chunks")
+    logger.debug("  📄 Flattened %d chunks from document %s -> %d valid chunks",
+                 len(content_chunks), doc.get('id', 'unknown'), len(flattened_docs))
     return flattened_docs
 
 def normalize_json_data(data):
@@ -298,121 +585,286 @@ def normalize_json_data(data):
             # Treat as single document
             return [data]
     else:
-        print(f"  ⚠ Unexpected data structure type: {type(data)}")
+        logger.warning("  ⚠ Unexpected data structure type: %s", type(data))
         return []
 
+def count_words(text):
+    """Count whitespace-separated words in text."""
+    return len(text.split())
+
 def validate_legal_document_structure(doc):
     """
     Validate that legal documents have required structure for effective embeddings.
     """
-    required_fields = ['id', 'content', 'category', 'sourcepage']
-    missing_fields = [field for field in required_fields if not doc.get(field)]
+    missing_fields = [field for field in LEGAL_REQUIRED_FIELDS if not doc.get(field)]
     
     if missing_fields:
-        print(f"  ⚠️ Missing legal metadata: {missing_fields}")
+        logger.debug("  ⚠️ Missing legal metadata: %s", missing_fields)
         return False
     
     # Check content length for legal documents
-    content = doc.get('content', '')
-    if len(content.split()) < 50:
-        print(f"  ⚠️ Content too short for meaningful legal embedding: {len(content.split())} words")
+    word_count = count_words(doc.get('content', ''))
+    if word_count < 50:
+        logger.debug("  ⚠️ Content too short for meaningful legal embedding: %d words", word_count)
         return False
     
-    if len(content.split()) > 2000:
-        print(f"  ⚠️ Content very long, may need chunking: {len(content.split())} words")
+    if word_count > 2000:
+        logger.debug("  ⚠️ Content very long, may need chunking: %d words", word_count)
     
     return True
 
-def process_file(file_path, analyze_only=False, flatten_chunks=False):
+def process_file(file_path, analyze_only=False, flatten_chunks=False, embedding_dtype="float32", max_concurrency=None):
     """Process a single JSON file with legal document validation."""
-    print(f"Processing: {file_path}")
-    
+    return asyncio.run(process_file_async(
+        file_path, analyze_only=analyze_only, flatten_chunks=flatten_chunks,
+        embedding_dtype=embedding_dtype, max_concurrency=max_concurrency
+    ))
+
+def iter_documents(f):
+    """
+    Yield documents from a JSON file opened in binary mode.
+
+    Top-level arrays are streamed one document at a time with ijson so large
+    files never have to be held in memory; other layouts (wrapper objects or
+    single documents) are loaded whole and normalized.
+    """
+    head = f.read(1)
+    while head and head.isspace():
+        head = f.read(1)
+    f.seek(0)
+
+    if head == b'[':
+        yield from ijson.items(f, 'item', use_float=True)
+    else:
+        yield from normalize_json_data(orjson.loads(f.read()))
+
+def load_partial_embeddings(file_path):
+    """
+    Recover embeddings by document id from an interrupted run's .partial file.
+
+    The checkpoint is only trusted when it is newer than the source file, and
+    a truncated tail (the process died mid-write) is ignored.
+    """
+    partial_path = f"{file_path}.partial"
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            raw_data = json.load(f)
-        
-        if analyze_only:
-            analyze_json_structure(file_path)
-            return False
+        if os.path.getmtime(partial_path) <= os.path.getmtime(file_path):
+            return {}
+    except OSError:
+        return {}
+
+    salvaged = {}
+    try:
+        with open(partial_path, 'rb') as f:
+            for doc in ijson.items(f, 'item', use_float=True):
+                if isinstance(doc, dict) and doc.get('id') and has_valid_embedding(doc):
+                    salvaged[doc['id']] = np.asarray(doc['embedding'], dtype=np.float32)
+    except ijson.JSONError:
+        pass  # Truncated checkpoint: keep what was read before the cut
+    return salvaged
+
+async def embed_documents(docs, start_index, client, semaphore, cache, counts, sidecar=None, salvaged=None):
+    """
+    Add embeddings to every document in ``docs`` that is missing one.
+
+    Cached embeddings are reused and the rest are generated in concurrent
+    batches bounded by ``semaphore``. ``counts`` is updated with processed/generated/error totals.
+    Documents whose ``embedding_ref`` points at an entry in ``sidecar`` are
+    treated as already embedded, and ``salvaged`` embeddings recovered from a
+    checkpoint are reused by document id.
+    
+    Returns:
+        bool: True if any document was updated
+    """
+    updated = False
+
+    # First pass: find documents that still need an embedding
+    pending = []
+    for i, doc in enumerate(docs, start_index):
+        if not isinstance(doc, dict):
+            logger.debug("  ⚠ Document %d is not a dictionary, skipping", i)
+            counts["errors"] += 1
+            continue
+
+        # Always regenerate if embedding is missing or wrong length
+        if has_valid_embedding(doc):
+            counts["processed"] += 1
+            continue
+        if sidecar and doc.get("embedding_ref") and doc.get("id") in sidecar:
+            counts["processed"] += 1
+            continue
+        if salvaged and doc.get("id") in salvaged:
+            doc["embedding"] = salvaged.pop(doc["id"])
+            doc.pop("embedding_ref", None)
+            updated = True
+            counts["processed"] += 1
+            continue
         
-        # Normalize data structure
-        docs = normalize_json_data(raw_data)
+        # Extract content from document
+        content, field_used = extract_content_from_document(doc)
         
-        if not docs:
-            print(f"  ⚠ No documents found in file")
+        if content:
+            pending.append((doc, field_used, content))
+        else:
+            logger.debug("  ⚠ No content found for id=%s", doc.get('id', f'doc_{i}'))
+            counts["errors"] += 1
+
+    if not pending:
+        return False
+
+    # Second pass: reuse cached embeddings, embed the rest in concurrent batches.
+    # Identical texts (repeated boilerplate) share a key and are embedded once.
+    keys = [cache.make_key(content) for _, _, content in pending]
+    embeddings_by_key = cache.get_many(keys)
+    if embeddings_by_key:
+        reused = sum(1 for key in keys if key in embeddings_by_key)
+        logger.debug("  💾 Reused %d cached embeddings", reused)
+
+    misses = {}
+    for key, (_, _, content) in zip(keys, pending):
+        if key not in embeddings_by_key and key not in misses:
+            misses[key] = content
+
+    batches = list(iter_batches(misses.items()))
+    if batches:
+        t0 = time.time()
+
+        async def embed_batch(batch):
+            embeddings = await generate_batch(client, [text for _, text in batch], semaphore)
+            batch_keys = [key for key, _ in batch]
+            cache.put_many(zip(batch_keys, embeddings))
+            embeddings_by_key.update(zip(batch_keys, embeddings))
+
+        await asyncio.gather(*(embed_batch(batch) for batch in batches))
+        dt = time.time() - t0
+        duplicates = sum(1 for key in keys if key in misses) - len(misses)
+        dedupe_note = f", {duplicates} duplicates shared" if duplicates else ""
+        logger.debug("  📦 Embedded %d unique texts in %d batches (%.2fs%s)", len(misses), len(batches), dt, dedupe_note)
+
+    for (doc, field_used, _), key in zip(pending, keys):
+        new_embedding = embeddings_by_key.get(key)
+        if new_embedding is not None:
+            doc["embedding"] = new_embedding  # Use Azure Search OpenAI demo field name
+            doc.pop("embedding_ref", None)
+            logger.debug("  ✅ Generated embedding for id=%s from '%s' (%d‑d)",
+                         doc.get('id', 'unknown'), field_used, len(new_embedding))
+            updated = True
+            counts["processed"] += 1
+            counts["generated"] += 1
+        else:
+            logger.debug("  ⚠ Failed to generate embedding for id=%s", doc.get('id', 'unknown'))
+            counts["errors"] += 1
+
+    return updated
+
+async def process_file_async(file_path, analyze_only=False, flatten_chunks=False, embedding_dtype="float32",
+                             max_concurrency=None):
+    """
+    Async implementation of process_file.
+
+    Documents are streamed through in windows large enough to keep every
+    concurrent request busy, and written to a ``.partial`` checkpoint that
+    is flushed after every window and atomically replaces the original once
+    all documents have been processed. If a run is interrupted, the next one
+    reuses the embeddings already written to the checkpoint.
+
+    With ``embedding_dtype`` float16 or bfloat16, embeddings are quantized into
+    a compressed .embeddings.npz sidecar and documents keep only an
+    ``embedding_ref`` to their entry. ``max_concurrency`` caps the requests in
+    flight for this file (default AZURE_OPENAI_EMBEDDING_MAX_CONCURRENCY).
+    """
+    if analyze_only:
+        print(f"Processing: {file_path}")
+        analyze_json_structure(file_path)
+        return False
+
+    # Note: flatten_chunks is disabled for Azure Search OpenAI demo format
+    # since documents are already in the correct individual format
+    if flatten_chunks:
+        logger.debug("  ℹ Flattening disabled - documents already in Azure Search OpenAI demo format")
+
+    max_concurrency = max_concurrency or embedding_max_concurrency
+    window_size = embedding_batch_size * max_concurrency
+    partial_path = f"{file_path}.partial"
+    counts = Counter()
+    updated = False
+    total_docs = 0
+    use_sidecar = embedding_dtype != "float32"
+    sidecar_arrays = {}
+    completed = False
+
+    cache = None
+    try:
+        cache = EmbeddingCache()
+        if cache.is_file_complete(file_path, embedding_dtype):
+            logger.info("ℹ Unchanged since last run with all documents embedded, skipping: %s", file_path)
             return False
-        
-        print(f"  📄 Found {len(docs)} documents")
-        
-        # Note: flatten_chunks is disabled for Azure Search OpenAI demo format
-        # since documents are already in the correct individual format
-        if flatten_chunks:
-            print("  ℹ Flattening disabled - documents already in Azure Search OpenAI demo format")
-        
-        updated = False
-        processed_count = 0
-        error_count = 0
-        embeddings_generated = 0
-        
-        for i, doc in enumerate(docs):
-            if not isinstance(doc, dict):
-                print(f"  ⚠ Document {i} is not a dictionary, skipping")
-                error_count += 1
-                continue
-
-            # Always regenerate if embedding is missing or wrong length
-            embedding = doc.get("embedding") or []
-            if isinstance(embedding, list) and len(embedding) == embedding_dimensions:
-                processed_count += 1
-                continue
-            
-            # Extract content from document
-            content, field_used = extract_content_from_document(doc)
-            
-            if content:
-                t0 = time.time()
-                new_embedding = generate(content)
-                dt = time.time() - t0
-                
-                if new_embedding:
-                    doc["embedding"] = new_embedding  # Use Azure Search OpenAI demo field name
-                    doc_id = doc.get('id', f'doc_{i}')
-                    print(f"  ✅ Generated embedding for id={doc_id} from '{field_used}' ({len(new_embedding)}‑d, {dt:.2f}s)")
-                    updated = True
-                    processed_count += 1
-                    embeddings_generated += 1
-                else:
-                    doc_id = doc.get('id', f'doc_{i}')
-                    print(f"  ⚠ Failed to generate embedding for id={doc_id}")
-                    error_count += 1
-            else:
-                doc_id = doc.get('id', f'doc_{i}')
-                print(f"  ⚠ No content found for id={doc_id}")
-                error_count += 1
 
-        print(f"  📊 Summary: {processed_count} processed, {embeddings_generated} new embeddings, {error_count} errors")
+        existing_sidecar = load_sidecar(file_path) if use_sidecar else None
+        salvaged = load_partial_embeddings(file_path)
+        if salvaged:
+            logger.info("ℹ Resuming %s: %d embeddings recovered from checkpoint", file_path, len(salvaged))
+        semaphore = asyncio.Semaphore(max_concurrency)
+        async with get_async_openai_client() as client:
+            with open(file_path, 'rb') as src, open(partial_path, 'wb') as out:
+                documents = iter_documents(src)
+                out.write(b"[\n")
+                while True:
+                    window = list(islice(documents, window_size))
+                    if not window:
+                        break
+                    if await embed_documents(window, total_docs, client, semaphore, cache, counts,
+                                             existing_sidecar, salvaged):
+                        updated = True
+                    for doc in window:
+                        if use_sidecar and isinstance(doc, dict):
+                            if move_embedding_to_sidecar(doc, file_path, embedding_dtype, existing_sidecar, sidecar_arrays):
+                                updated = True
+                        if total_docs:
+                            out.write(b",\n")
+                        out.write(orjson.dumps(doc, option=JSON_WRITE_OPTIONS))
+                        total_docs += 1
+                    out.flush()
+                out.write(b"\n]\n")
+        completed = True
+
+        if not total_docs:
+            logger.warning("⚠ No documents found in file: %s", file_path)
+            return False
 
         if updated:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(docs, f, indent=2, ensure_ascii=False)
-            print(f"✅ File updated: {file_path}")
-        else:
-            print(f"ℹ No updates needed: {file_path}")
+            if use_sidecar:
+                save_sidecar(file_path, sidecar_arrays)
+                logger.debug("  💾 Stored %d %s embeddings in %s",
+                             len(sidecar_arrays), embedding_dtype, get_sidecar_path(file_path).name)
+            os.replace(partial_path, file_path)
+
+        logger.info("%s %s: %d documents, %d processed, %d new embeddings, %d errors",
+                    "✅ Updated" if updated else "ℹ No updates needed", file_path,
+                    total_docs, counts['processed'], counts['generated'], counts['errors'])
+
+        if not counts["errors"]:
+            cache.mark_file_complete(file_path, embedding_dtype)
             
         return updated
         
-    except json.JSONDecodeError as e:
-        print(f"  ⚠ JSON decode error in {file_path}: {e}")
+    except (json.JSONDecodeError, ijson.JSONError) as e:
+        logger.error("  ⚠ JSON decode error in %s: %s", file_path, e)
         return False
     except Exception as e:
-        print(f"  ⚠ Error processing {file_path}: {e}")
+        logger.error("  ⚠ Error processing %s: %s", file_path, e)
         return False
+    finally:
+        if cache is not None:
+            cache.close()
+        # Keep the checkpoint after an interrupted run so the next one can resume
+        if completed and os.path.exists(partial_path):
+            os.remove(partial_path)
 
 def analyze_json_structure(file_path):
     """Analyze the structure of a JSON file to understand its format."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        with open(file_path, 'rb') as f:
+            data = orjson.loads(f.read())
         
         print(f"  📊 Analyzing structure of: {os.path.basename(file_path)}")
         
@@ -467,54 +919,77 @@ def analyze_json_structure(file_path):
     except Exception as e:
         print(f"  ⚠ Error analyzing structure: {e}")
 
-def validate_upload_directory():
+def find_json_files(directory, pattern="**/*.json"):
     """
-    Validate that the upload directory contains compatible JSON files.
+    List files in ``directory`` matching ``pattern``, sorted by path.
+
+    Non-recursive patterns are matched against a single os.scandir pass
+    instead of a full pathlib glob.
     """
-    upload_dir = project_root / "data" / "processed" / "Upload"
-    if not upload_dir.exists():
-        print(f"❌ Upload directory not found: {upload_dir}")
-        return False
+    directory = Path(directory)
+    if "**" in pattern or "/" in pattern:
+        return sorted(directory.glob(pattern))
+    with os.scandir(directory) as entries:
+        return sorted(
+            Path(entry.path) for entry in entries
+            if entry.is_file() and fnmatch.fnmatch(entry.name, pattern)
+        )
+
+def validate_upload_directory(json_files, sample_size=3):
+    """
+    Validate that the upload directory contains compatible JSON files.
     
-    json_files = list(upload_dir.glob("*.json"))
+    Reads only the first document of up to ``sample_size`` files and stops at
+    the first compatible one.
+    """
     if not json_files:
-        print(f"❌ No JSON files found in upload directory: {upload_dir}")
+        print(f"❌ No JSON files found in upload directory")
         return False
     
     print(f"✅ Found {len(json_files)} JSON files in upload directory")
     
-    # Sample a few files to check structure
-    sample_files = json_files[:3]  # Check first 3 files
-    compatible_count = 0
-    
-    for file_path in sample_files:
+    for file_path in json_files[:sample_size]:
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with open(file_path, 'rb') as f:
+                first_doc = next(iter_documents(f), None)
             
-            docs = normalize_json_data(data)
-            if docs and isinstance(docs[0], dict):
-                content, field = extract_content_from_document(docs[0])
+            if isinstance(first_doc, dict):
+                content, field = extract_content_from_document(first_doc)
                 if content:
-                    compatible_count += 1
                     print(f"  ✅ {file_path.name}: Compatible (content found in '{field}')")
-                else:
-                    print(f"  ⚠️ {file_path.name}: No extractable content found")
+                    return True
+                print(f"  ⚠️ {file_path.name}: No extractable content found")
             else:
                 print(f"  ⚠️ {file_path.name}: Invalid document structure")
                 
         except Exception as e:
             print(f"  ❌ {file_path.name}: Error reading file - {e}")
     
-    if compatible_count == 0:
-        print(f"❌ No compatible files found in sample")
-        return False
-    elif compatible_count < len(sample_files):
-        print(f"⚠️ Only {compatible_count}/{len(sample_files)} sample files are compatible")
-    else:
-        print(f"✅ All sampled files are compatible")
-    
-    return True
+    print(f"❌ No compatible files found in sample")
+    return False
+
+def process_files(json_files, workers=1, **kwargs):
+    """
+    Process JSON files, in parallel worker processes when ``workers`` > 1.
+
+    The request concurrency budget is split across workers so the total number
+    of requests in flight stays within AZURE_OPENAI_EMBEDDING_MAX_CONCURRENCY.
+
+    Returns:
+        int: Number of files updated
+    """
+    workers = max(1, min(workers, len(json_files)))
+    if workers == 1:
+        return sum(1 for json_file in json_files if process_file(str(json_file), **kwargs))
+
+    kwargs.setdefault("max_concurrency", max(1, embedding_max_concurrency // workers))
+    updated_count = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(process_file, str(json_file), **kwargs): json_file for json_file in json_files}
+        for future in as_completed(futures):
+            if future.result():
+                updated_count += 1
+    return updated_count
 
 def main():
     parser = argparse.ArgumentParser(description="Generate embeddings for legal document chunks")
@@ -523,6 +998,11 @@ def main():
     parser.add_argument("--analyze", help="Only analyze file structures without generating embeddings", action="store_true")
     parser.add_argument("--pattern", help="File pattern within Upload directory (default: **/*.json)", default="**/*.json")
     parser.add_argument("--validate", help="Validate upload directory compatibility", action="store_true")
+    parser.add_argument("--embedding-dtype", choices=EMBEDDING_DTYPES, default="float32",
+                        help="Store embeddings inline as float32 (default) or in a quantized .embeddings.npz sidecar")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of files to process in parallel worker processes (default: 1). "
+                             "The request concurrency budget is split between them")
     
     args = parser.parse_args()
 
@@ -534,11 +1014,16 @@ def main():
     print(f"Deployment: {openai_deployment}")
     print(f"API Version: {openai_api_version}")
     print(f"Embedding Dimensions: {embedding_dimensions}")
+    print(f"Embedding Storage: {'inline' if args.embedding_dtype == 'float32' else args.embedding_dtype + ' sidecar'}")
     print(f"Authentication: Azure Identity with API key fallback")
     print("="*60)
     print("📋 Processing documents in Azure Search OpenAI demo format")
     print("="*60 + "\n")
 
+    # --analyze and --validate only inspect files, so they never need to authenticate
+    if not (args.analyze or args.validate):
+        init_openai_client()
+
     # Note: No flattening needed for Azure Search OpenAI demo format
     flatten_chunks = False
 
@@ -547,25 +1032,26 @@ def main():
     if args.upload_dir or not args.path:
         # Process all JSON files in the Upload directory
         upload_dir = project_root / "data" / "processed" / "Upload"
-        json_files = list(upload_dir.glob(pattern))
-        if not validate_upload_directory():
-            print("❌ Upload directory validation failed. Use --validate to check compatibility.")
+        if not upload_dir.exists():
+            print(f"❌ Upload directory not found: {upload_dir}")
             sys.exit(1)
-        if not json_files:
-            print("❌ No JSON files found in upload directory.")
+        json_files = find_json_files(upload_dir, pattern)
+        if not validate_upload_directory(json_files):
+            print("❌ Upload directory validation failed. Use --validate to check compatibility.")
             sys.exit(1)
+        if args.validate:
+            return
         print(f"Found {len(json_files)} JSON files in Upload directory")
         print(f"Flatten chunks: {'Yes' if flatten_chunks else 'No'}")
-        updated_count = 0
         if args.analyze:
             print("\n=== ANALYZING FILE STRUCTURES ===")
             for json_file in json_files:
                 process_file(str(json_file), analyze_only=True)
                 print()  # Add spacing between files
         else:
-            for json_file in json_files:
-                if process_file(str(json_file), flatten_chunks=flatten_chunks):
-                    updated_count += 1
+            updated_count = process_files(
+                json_files, workers=args.workers, flatten_chunks=flatten_chunks, embedding_dtype=args.embedding_dtype
+            )
             print(f"✅ Processing complete: {updated_count}/{len(json_files)} files updated")
     else:
         # Process a single file or pattern
@@ -577,25 +1063,24 @@ def main():
             if args.analyze:
                 process_file(str(path), analyze_only=True)
             else:
-                if process_file(str(path), flatten_chunks=flatten_chunks):
+                if process_file(str(path), flatten_chunks=flatten_chunks, embedding_dtype=args.embedding_dtype):
                     print("✅ Processing complete: File updated")
                 else:
                     print("ℹ Processing complete: No updates needed")
         elif path.is_dir():
-            json_files = list(path.glob(pattern))
+            json_files = find_json_files(path, pattern)
             if not json_files:
                 print(f"No JSON files found in directory: {path}")
                 sys.exit(1)
-            updated_count = 0
             if args.analyze:
                 print("\n=== ANALYZING FILE STRUCTURES ===")
                 for json_file in json_files:
                     process_file(str(json_file), analyze_only=True)
                     print()
             else:
-                for json_file in json_files:
-                    if process_file(str(json_file), flatten_chunks=flatten_chunks):
-                        updated_count += 1
+                updated_count = process_files(
+                    json_files, workers=args.workers, flatten_chunks=flatten_chunks, embedding_dtype=args.embedding_dtype
+                )
                 print(f"✅ Processing complete: {updated_count}/{len(json_files)} files updated")
         else:
             print(f"Path is not a file or directory: {args.path}")
@@ -5,16 +5,32 @@ Only uploads files that have changed since last upload.
 Uses Azure SDK with Azure Identity authentication.
 """
 import os
+import re
 import sys
 import argparse
 import json
 import logging
-import glob
 import hashlib
+import mmap
 import time
 import base64
+import functools
+import sqlite3
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from itertools import islice
 from pathlib import Path
 
+import ijson
+import numpy as np
+
+# orjson parses and serializes several times faster than the stdlib json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Add project root to path
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.append(project_root)
@@ -32,10 +48,12 @@ except ImportError as e:
 # Azure SDK imports
 try:
     from azure.search.documents.indexes import SearchIndexClient
-    from azure.search.documents import SearchClient
+    from azure.search.documents import SearchClient, SearchIndexingBufferedSender
     from azure.identity import DefaultAzureCredential, AzureCliCredential, ChainedTokenCredential
     from azure.core.credentials import AzureKeyCredential
     from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError, HttpResponseError
+    from azure.core.pipeline.transport import RequestsTransport
+    import requests
 
     # If the above import fails, ensure azure-search-documents is installed/upgraded:
     # pip install --upgrade azure-search-documents
@@ -55,52 +73,298 @@ logger = logging.getLogger(__name__)
 # Create a cache directory if it doesn't exist
 CACHE_DIR = os.path.join(project_root, "data", "cache")
 os.makedirs(CACHE_DIR, exist_ok=True)
-UPLOAD_CACHE_FILE = os.path.join(CACHE_DIR, "upload_hashes.json")
+UPLOAD_CACHE_DB = os.path.join(CACHE_DIR, "upload_hashes.sqlite")
+# Upload progress is saved to the cache every this many files or seconds
+CACHE_SAVE_INTERVAL_FILES = 50
+CACHE_SAVE_INTERVAL_SECONDS = 30
+# Pre-SQLite cache, imported once into the database if present
+LEGACY_UPLOAD_CACHE_FILE = os.path.join(CACHE_DIR, "upload_hashes.json")
+
+# Azure Search accepts at most 1000 documents and 16 MB per indexing request;
+# stay under the byte limit to leave room for the request envelope
+MAX_BATCH_DOCS = 1000
+MAX_BATCH_BYTES = 14 * 1024 * 1024
+
+# Hints logged when uploads fail with these HTTP status codes
+UPLOAD_ERROR_GUIDANCE = {
+    413: "Single document too large for a request. Check the document content size",
+    429: "Rate limited after retries. Try reducing --max-concurrency",
+    400: "Bad request. Check document format and field mappings",
+}
+
+# Simple key sanitization keeps letters, digits, '_' and '-' (Unicode-aware, like
+# str.isalnum) and replaces everything else with '_'. ASCII keys, the common
+# case, go through a translate table; \w matches exactly isalnum() plus '_'.
+_ASCII_KEY_TABLE = {c: c if chr(c).isalnum() or chr(c) in '_-' else ord('_') for c in range(128)}
+_INVALID_KEY_CHARS = re.compile(r'[^\w-]')
+
+# Delete batches sent concurrently when removing duplicates
+DELETE_CONCURRENCY = 4
+
+# Below this many files a process pool costs more to start than hashing saves
+PARALLEL_HASH_MIN_FILES = 32
+
+# Fields that make up a document's duplicate fingerprint: the first non-empty
+# content field, then every non-empty metadata field
+FINGERPRINT_CONTENT_FIELDS = ['content', 'chunk_content', 'text', 'chunk']
+FINGERPRINT_METADATA_FIELDS = ['title', 'source', 'case_number', 'document_type', 'section_title', 'parent_id', 'chunk_id']
+# Metadata fields assumed present when the index schema can't be read
+DUPLICATE_DEFAULT_FIELDS = {'parent_id'}
+# Document ids per search.in() lookup when fetching duplicate candidates
+DUPLICATE_LOOKUP_BATCH = 500
+# Documents per query when scanning the whole index (the service returns at most 1000)
+INDEX_SCAN_PAGE_SIZE = 1000
+
+# Fallback values for fields missing from a source document
+_DEFAULT_ID = "unknown_doc"
+_DEFAULT_CATEGORY = "Legal Document"
+_DEFAULT_SOURCEPAGE = "Unknown Section"
+_DEFAULT_SOURCEFILE = "Unknown Document"
+_DEFAULT_UPDATED = "2024-01-01T00:00:00Z"
 
+# HTTP connection pool shared by every search client. The requests default of
+# 10 pooled connections per host is below what concurrent uploads, duplicate
+# scans and deletes open together, and overflow connections each pay a TLS
+# handshake and are then discarded. configure_http_pool() raises it to the
+# number of uploads a run keeps in flight.
+HTTP_POOL_SIZE = 32
+_http_pool_size = HTTP_POOL_SIZE
+HTTP_CONNECTION_TIMEOUT = 30
+HTTP_READ_TIMEOUT = 300
+
+# Token scope for Azure AI Search data-plane requests
+SEARCH_TOKEN_SCOPE = "https://search.azure.com/.default"
+
+@functools.lru_cache(maxsize=1)
 def get_search_credentials():
-    """Get Azure Search credentials using Azure best practices."""
+    """
+    Get Azure Search credentials using Azure best practices.
+
+    Resolved once per process: the identity check is a single token request
+    rather than a full list_indexes() call, and the result is reused by every
+    client the script creates.
+    """
+    endpoint = Config.AZURE_SEARCH_SERVICE
+
+    # Azure best practice: Try Azure Identity first
     try:
-        from azure.identity import DefaultAzureCredential
-        from azure.core.credentials import AzureKeyCredential
-        
-        endpoint = Config.AZURE_SEARCH_SERVICE
-        
-        # Azure best practice: Try Azure Identity first
+        credential = DefaultAzureCredential()
+        credential.get_token(SEARCH_TOKEN_SCOPE)  # Fails if no identity is available
+        logger.info("✅ Using Azure Identity (Best Practice)")
+        return endpoint, credential
+    except Exception:
+        # Fallback to API key
+        logger.info("Using API Key authentication")
+        return endpoint, AzureKeyCredential(Config.AZURE_SEARCH_KEY)
+
+@functools.lru_cache(maxsize=1)
+def get_http_session():
+    """requests session with a connection pool sized for concurrent batches."""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=_http_pool_size, pool_maxsize=_http_pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def configure_http_pool(max_connections):
+    """
+    Size the shared connection pool for ``max_connections`` concurrent
+    requests. Clients created afterwards use a session with the new size.
+    """
+    global _http_pool_size
+    pool_size = max(HTTP_POOL_SIZE, max_connections)
+    if pool_size != _http_pool_size:
+        _http_pool_size = pool_size
+        get_http_session.cache_clear()
+
+def get_transport():
+    """
+    Transport over the shared session. The session is not owned by the
+    transport, so closing a client leaves the pooled connections open.
+    """
+    return RequestsTransport(
+        session=get_http_session(),
+        session_owner=False,
+        connection_timeout=HTTP_CONNECTION_TIMEOUT,
+        read_timeout=HTTP_READ_TIMEOUT,
+    )
+
+@functools.lru_cache(maxsize=8)
+def get_search_client(index_name):
+    """Shared SearchClient for an index, so its connection pool is reused."""
+    search_endpoint, credential = get_search_credentials()
+    return SearchClient(search_endpoint, index_name, credential, transport=get_transport())
+
+@functools.lru_cache(maxsize=1)
+def get_index_client():
+    """Shared SearchIndexClient for schema lookups."""
+    search_endpoint, credential = get_search_credentials()
+    return SearchIndexClient(search_endpoint, credential, transport=get_transport())
+
+def json_loads(data):
+    """Parse JSON bytes with orjson when available."""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+def json_load_file(f):
+    """
+    Parse an open binary JSON file. With orjson the file is parsed straight
+    from a read-only memory map, without first copying it into a bytes object.
+    """
+    if orjson is not None:
         try:
-            credential = DefaultAzureCredential()
-            # Test the credential
-            from azure.search.documents.indexes import SearchIndexClient
-            test_client = SearchIndexClient(endpoint=endpoint, credential=credential)
-            list(test_client.list_indexes())  # This will fail if credential doesn't work
-            
-            logger.info("✅ Using Azure Identity (Best Practice)")
-            return endpoint, credential
-            
-        except Exception:
-            # Fallback to API key
-            logger.info("Using API Key authentication")
-            return endpoint, AzureKeyCredential(Config.AZURE_SEARCH_KEY)
-            
-    except Exception as e:
-        logger.error(f"Authentication setup failed: {e}")
-        raise
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty files can't be mapped
+            pass
+        else:
+            with mm, memoryview(mm) as view:
+                return orjson.loads(view)
+    return json_loads(f.read())
+
+def json_dumps(doc):
+    """Serialize a document as compact JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(doc)
+    return json.dumps(doc, separators=(',', ':')).encode('utf-8')
+
+class UploadCache:
+    """
+    File path -> hash cache backed by SQLite.
+
+    Lookups are single-row reads; new hashes are buffered and written in one
+    transaction by flush(), so saving costs O(changed files) rather than
+    rewriting the whole cache. WAL mode lets concurrent runs read while
+    another one writes. Files processed in parallel share one connection,
+    so access is serialized with a lock.
+
+    Each hash is stored with the size and mtime the file had when it was
+    hashed, so unchanged files can be recognized from os.stat() alone.
+    A second table keeps a fingerprint of every document uploaded to each
+    index, so documents that didn't change inside a changed file can be
+    skipped. Fingerprints are per index, and documents deleted from an index
+    are forgotten, so a document is only skipped if that index still has it.
+    """
+
+    def __init__(self, db_path):
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # In WAL mode this only syncs at checkpoints; a power loss can drop
+        # the last saves, which just means re-uploading those files
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS cache (path TEXT PRIMARY KEY, hash TEXT NOT NULL)")
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(cache)")}
+        for column in ("mtime_ns", "size"):
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE cache ADD COLUMN {column} INTEGER")
+        # The first version of the fingerprint table had no index name, so
+        # its rows can't tell which index holds the document
+        self.conn.execute("DROP TABLE IF EXISTS documents")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS index_documents (index_name TEXT NOT NULL, id TEXT NOT NULL, "
+            "fingerprint BLOB NOT NULL, PRIMARY KEY (index_name, id))"
+        )
+        self.pending = {}  # path -> (hash, mtime_ns, size)
+        self.pending_documents = {}  # (index name, document id) -> fingerprint
+        self.lock = threading.Lock()
+
+    def get(self, file_path, default=None):
+        with self.lock:
+            if file_path in self.pending:
+                return self.pending[file_path][0]
+            row = self.conn.execute("SELECT hash FROM cache WHERE path = ?", (file_path,)).fetchone()
+        return row[0] if row else default
+
+    def __setitem__(self, file_path, file_hash):
+        self.record(file_path, file_hash)
+
+    def record(self, file_path, file_hash, stat=None):
+        """Buffer a file's hash, with the os.stat() result it was computed from if known."""
+        entry = (file_hash, stat.st_mtime_ns, stat.st_size) if stat is not None else (file_hash, None, None)
+        with self.lock:
+            self.pending[file_path] = entry
+
+    def unchanged_hash(self, file_path, stat):
+        """The cached hash if the file's size and mtime still match, else None."""
+        key = (stat.st_mtime_ns, stat.st_size)
+        with self.lock:
+            if file_path in self.pending:
+                entry = self.pending[file_path]
+                return entry[0] if entry[1:] == key else None
+            row = self.conn.execute(
+                "SELECT hash FROM cache WHERE path = ? AND mtime_ns = ? AND size = ?", (file_path, *key)
+            ).fetchone()
+        return row[0] if row else None
+
+    def document_unchanged(self, index_name, doc_id, fingerprint):
+        """Whether the document was last uploaded to the index with this fingerprint."""
+        with self.lock:
+            if (index_name, doc_id) in self.pending_documents:
+                return self.pending_documents[index_name, doc_id] == fingerprint
+            row = self.conn.execute(
+                "SELECT fingerprint FROM index_documents WHERE index_name = ? AND id = ?", (index_name, doc_id)
+            ).fetchone()
+        return row is not None and row[0] == fingerprint
+
+    def record_documents(self, index_name, fingerprints):
+        """Buffer fingerprints ({document id: fingerprint}) of documents uploaded to the index."""
+        with self.lock:
+            self.pending_documents.update(((index_name, doc_id), fingerprint) for doc_id, fingerprint in fingerprints.items())
+
+    def forget_documents(self, index_name, doc_ids):
+        """Drop fingerprints of documents deleted from the index, so they are uploaded again."""
+        with self.lock:
+            for doc_id in doc_ids:
+                self.pending_documents.pop((index_name, doc_id), None)
+            with self.conn:
+                self.conn.executemany(
+                    "DELETE FROM index_documents WHERE index_name = ? AND id = ?",
+                    [(index_name, doc_id) for doc_id in doc_ids]
+                )
+
+    def is_empty(self):
+        with self.lock:
+            return self.conn.execute("SELECT 1 FROM cache LIMIT 1").fetchone() is None
+
+    def flush(self):
+        """Write buffered hashes and document fingerprints in a single transaction."""
+        with self.lock:
+            if not self.pending and not self.pending_documents:
+                return
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO cache (path, hash, mtime_ns, size) VALUES (?, ?, ?, ?)",
+                    [(path, *entry) for path, entry in self.pending.items()]
+                )
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO index_documents (index_name, id, fingerprint) VALUES (?, ?, ?)",
+                    [(index_name, doc_id, fingerprint) for (index_name, doc_id), fingerprint in self.pending_documents.items()]
+                )
+            self.pending.clear()
+            self.pending_documents.clear()
 
 def load_upload_cache():
-    """Load the file upload hash cache from disk."""
+    """Open the file upload hash cache, importing the old JSON cache on first use."""
     try:
-        if os.path.exists(UPLOAD_CACHE_FILE):
-            with open(UPLOAD_CACHE_FILE, 'r') as f:
-                return json.load(f)
-    except Exception as e:
-        logger.warning(f"Could not load upload hash cache: {e}")
-    return {}
+        upload_cache = UploadCache(UPLOAD_CACHE_DB)
+    except sqlite3.Error as e:
+        logger.warning(f"Could not open upload hash cache: {e}")
+        return UploadCache(":memory:")
+
+    if os.path.exists(LEGACY_UPLOAD_CACHE_FILE) and upload_cache.is_empty():
+        try:
+            with open(LEGACY_UPLOAD_CACHE_FILE, 'rb') as f:
+                for file_path, file_hash in json_load_file(f).items():
+                    upload_cache.record(file_path, file_hash)
+            upload_cache.flush()
+            logger.info(f"Imported {LEGACY_UPLOAD_CACHE_FILE} into {UPLOAD_CACHE_DB}")
+        except Exception as e:
+            logger.warning(f"Could not import legacy upload hash cache: {e}")
+    return upload_cache
 
 def save_upload_cache(upload_cache):
-    """Save the file upload hash cache to disk."""
+    """Persist hashes recorded since the last save."""
     try:
-        with open(UPLOAD_CACHE_FILE, 'w') as f:
-            json.dump(upload_cache, f, indent=2)
-    except Exception as e:
+        upload_cache.flush()
+    except sqlite3.Error as e:
         logger.error(f"Failed to save upload hash cache: {e}")
 
 def compute_file_hash(file_path):
@@ -114,22 +378,22 @@ def compute_file_hash(file_path):
         # For small files (< 1MB), hash the entire content
         if file_size < 1024 * 1024:
             with open(file_path, 'rb') as f:
-                file_content = f.read()
-                content_hash = hashlib.sha256(file_content).hexdigest()
+                if hasattr(hashlib, "file_digest"):  # Python 3.11+
+                    content_hash = hashlib.file_digest(f, "sha256").hexdigest()
+                else:
+                    content_hash = hashlib.sha256(f.read()).hexdigest()
         else:
-            # For larger files, hash first 100KB + middle 100KB + last 100KB + metadata
-            with open(file_path, 'rb') as f:
-                head = f.read(102400)  # First 100KB
-                
-                # Move to the middle of the file
-                f.seek(file_size // 2 - 51200)
-                middle = f.read(102400)  # Middle 100KB
-                
-                # Move to near the end of the file
-                f.seek(-102400, 2)
-                tail = f.read(102400)  # Last 100KB
-                
-                content_hash = hashlib.sha256(head + middle + tail).hexdigest()
+            # For larger files, hash first 100KB + middle 100KB + last 100KB + metadata.
+            # Slices of the mapped file are hashed in place without copying.
+            with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                view = memoryview(mm)
+                try:
+                    sha = hashlib.sha256(view[:102400])  # First 100KB
+                    sha.update(view[file_size // 2 - 51200:file_size // 2 + 51200])  # Middle 100KB
+                    sha.update(view[-102400:])  # Last 100KB
+                    content_hash = sha.hexdigest()
+                finally:
+                    view.release()
         
         # Combine content hash with metadata for a complete hash
         combined_hash = f"{content_hash}_{file_size}_{int(file_mtime)}"
@@ -140,22 +404,54 @@ def compute_file_hash(file_path):
         # Return a timestamp-based hash as fallback to force processing
         return f"error_hash_{int(time.time())}"
 
-def file_has_changed(file_path, upload_cache):
+def _hash_one(file_path):
+    return file_path, compute_file_hash(file_path)
+
+def compute_file_hashes(file_paths):
+    """Hash files across CPU cores, returning {file_path: hash}."""
+    if len(file_paths) < PARALLEL_HASH_MIN_FILES:
+        return dict(map(_hash_one, file_paths))
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        return dict(executor.map(_hash_one, file_paths, chunksize=32))
+
+def file_has_changed(file_path, upload_cache, current_hash=None):
     """Check if a file has changed since last upload."""
-    current_hash = compute_file_hash(file_path)
+    if current_hash is None:
+        current_hash = compute_file_hash(file_path)
     previous_hash = upload_cache.get(file_path)
 
     if previous_hash != current_hash:
         if previous_hash:
-            logger.info(f"File hash changed since last upload: {file_path} (Previous: {previous_hash[:8]}..., Current: {current_hash[:8]}...). Marked for upload.")
+            logger.info("File hash changed since last upload: %s (Previous: %s..., Current: %s...). Marked for upload.",
+                        file_path, previous_hash[:8], current_hash[:8])
         else:
-            logger.info(f"File is new or not found in cache: {file_path}. Marked for upload.")
+            logger.info("File is new or not found in cache: %s. Marked for upload.", file_path)
         upload_cache[file_path] = current_hash # Update cache with the new hash
         return True
     else:
-        logger.info(f"File hash unchanged since last upload, skipping: {file_path} (Hash: {current_hash[:8]}...)")
+        logger.debug("File hash unchanged since last upload, skipping: %s (Hash: %s...)", file_path, current_hash[:8])
         return False
 
+def list_json_files(directory):
+    """
+    List the non-summary .json files directly inside a directory.
+
+    Uses a single os.scandir pass and filters on the name before touching
+    file metadata. Hidden files are skipped, matching glob behaviour.
+    Returns an empty list if the directory doesn't exist.
+    """
+    try:
+        with os.scandir(directory) as entries:
+            return [
+                entry for entry in entries
+                if entry.name.endswith('.json')
+                and not entry.name.endswith('_summary.json')
+                and not entry.name.startswith('.')
+                and entry.is_file()
+            ]
+    except FileNotFoundError:
+        return []
+
 def find_json_files(base_processed_dir, file_pattern):
     """
     Find JSON files based on the pattern.
@@ -164,70 +460,41 @@ def find_json_files(base_processed_dir, file_pattern):
     logger.info(f"Base processed directory: {base_processed_dir}")
     logger.info(f"Input file pattern: {file_pattern}")
     
-    # Handle different patterns
+    # Resolve the pattern to a directory, a file name prefix/suffix to match
+    # there, and a directory whose JSON files are used if nothing matches
+    prefix, suffix = "", ".json"
     if file_pattern.endswith("-flattened"):
         # Remove the -flattened suffix to get the actual directory name
-        pattern_name = file_pattern.replace("-flattened", "")
-        target_dir = os.path.join(base_processed_dir, pattern_name)
-        
-        if os.path.isdir(target_dir):
-            # Look for files with _flattened suffix first
-            glob_pattern = os.path.join(target_dir, "*_flattened.json")
-            logger.info(f"Flattened files pattern detected. Using: {glob_pattern}")
-            files = glob.glob(glob_pattern, recursive=False)
-            
-            if not files:
-                logger.warning(f"No flattened files found. Looking for all JSON files in: {target_dir}")
-                # Fallback to all JSON files in the directory
-                glob_pattern = os.path.join(target_dir, "*.json")
-                files = glob.glob(glob_pattern, recursive=False)
-        else:
+        target_dir = os.path.join(base_processed_dir, file_pattern.replace("-flattened", ""))
+        if not os.path.isdir(target_dir):
             logger.error(f"Directory not found: {target_dir}")
             return []
+        # Look for files with _flattened suffix first, else all JSON files
+        suffix = "_flattened.json"
+        fallback_dir = target_dir
+    elif file_pattern == "Upload":
+        # Special case for Upload directory - get all JSON files
+        target_dir = os.path.join(base_processed_dir, "Upload")
+        fallback_dir = None
     else:
-        # Direct pattern matching
-        if file_pattern == "Upload":
-            # Special case for Upload directory - get all JSON files
-            target_dir = os.path.join(base_processed_dir, "Upload")
-            glob_pattern = os.path.join(target_dir, "*.json")
-            logger.info(f"Upload directory pattern. Using: {glob_pattern}")
-        else:
-            # Look for specific pattern
-            glob_pattern = os.path.join(base_processed_dir, f"{file_pattern}*.json")
-            logger.info(f"Specific pattern. Using: {glob_pattern}")
-        
-        files = glob.glob(glob_pattern, recursive=False)
+        # Look for specific pattern, else a directory with the pattern's name
+        target_dir = base_processed_dir
+        prefix = file_pattern
+        fallback_dir = os.path.join(base_processed_dir, file_pattern)
     
-    logger.info(f"Using glob pattern: {glob_pattern} (Recursive: False)")
+    logger.info(f"Using pattern: {os.path.join(target_dir, prefix + '*' + suffix)}")
+    entries = list_json_files(target_dir)
+    json_files = [e.path for e in entries if e.name.startswith(prefix) and e.name.endswith(suffix)]
     
-    # Filter out non-JSON files and summary files if needed
-    json_files = [f for f in files if f.endswith('.json') and not f.endswith('_summary.json')]
+    if not json_files and fallback_dir:
+        if fallback_dir != target_dir:
+            entries = list_json_files(fallback_dir)
+        json_files = [e.path for e in entries]
+        if json_files:
+            logger.warning(f"No files matched; using all JSON files in: {fallback_dir}")
     
     if not json_files:
-        logger.warning(f"No files found matching pattern: {file_pattern} (resolved to: {glob_pattern})")
-        
-        # Debug: List directory contents
-        if file_pattern.endswith("-flattened"):
-            debug_dir = os.path.join(base_processed_dir, file_pattern.replace("-flattened", ""))
-        else:
-            debug_dir = os.path.join(base_processed_dir, file_pattern) if file_pattern != "Upload" else os.path.join(base_processed_dir, "Upload")
-            
-        logger.info(f"Listing contents of directory for debugging: {debug_dir}")
-        try:
-            if os.path.exists(debug_dir):
-                contents = os.listdir(debug_dir)
-                json_contents = [f for f in contents if f.endswith('.json')]
-                logger.info(f"  JSON files found: {json_contents}")
-                
-                # If we found JSON files but none matched our pattern, use them all
-                if json_contents and not json_files:
-                    logger.info("Using all JSON files found in directory")
-                    json_files = [os.path.join(debug_dir, f) for f in json_contents if not f.endswith('_summary.json')]
-            else:
-                logger.error(f"Directory does not exist: {debug_dir}")
-                
-        except Exception as e:
-            logger.error(f"Error listing directory contents: {e}")
+        logger.warning(f"No files found matching pattern: {file_pattern}")
     
     logger.info(f"Found {len(json_files)} matching files.")
     return json_files
@@ -237,11 +504,7 @@ def validate_index_exists(index_name):
     Validate that the specified index exists in Azure Search using Azure SDK.
     """
     try:
-        # Get credentials using Azure Identity
-        search_endpoint, credential = get_search_credentials()
-        
-        # Create index client
-        index_client = SearchIndexClient(search_endpoint, credential)
+        index_client = get_index_client()
         
         # Try to get the index
         index_data = index_client.get_index(index_name)
@@ -274,199 +537,261 @@ def validate_index_exists(index_name):
         logger.info("Check your Azure Search service endpoint and credentials.")
         return False
 
+def resolve_embedding_refs(documents, file_path):
+    """
+    Inline embeddings that generate_embeddings.py stored in a quantized
+    .embeddings.npz sidecar (``--embedding-dtype float16|bfloat16``).
+
+    Documents are yielded as they arrive; the sidecar is opened on the first
+    document that needs it.
+    """
+    sidecar_path = Path(file_path).with_suffix(".embeddings.npz")
+    sidecar = None
+    sidecar_keys = None
+    try:
+        for doc in documents:
+            if isinstance(doc, dict) and doc.get("embedding_ref") and not doc.get("embedding"):
+                if sidecar_keys is None:
+                    try:
+                        sidecar = np.load(sidecar_path)
+                        sidecar_keys = set(sidecar.files)
+                    except Exception as e:
+                        logger.error(f"Error loading embedding sidecar {sidecar_path}: {e}")
+                        sidecar_keys = set()
+                key = doc["embedding_ref"].rpartition("#")[2]
+                if key in sidecar_keys:
+                    arr = sidecar[key]
+                    if arr.dtype == np.uint16:
+                        # bfloat16 is stored as the upper 16 bits of a float32
+                        arr = (arr.astype(np.uint32) << 16).view(np.float32)
+                    doc["embedding"] = arr.astype(np.float32).tolist()
+                elif sidecar is not None:
+                    logger.warning(f"Embedding {doc['embedding_ref']} not found in {sidecar_path.name}")
+            yield doc
+    finally:
+        if sidecar is not None:
+            sidecar.close()
+
 def load_documents_from_file(file_path):
-    """Load documents from a JSON file."""
+    """
+    Yield documents from a JSON file.
+
+    Top-level arrays are streamed one document at a time with ijson so a file
+    never has to fit in memory; any other JSON value is treated as a single
+    document.
+    """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Handle both array and single document formats
-        if isinstance(data, list):
-            return data
-        else:
-            return [data]
+        with open(file_path, 'rb') as f:
+            head = f.read(1)
+            while head and head.isspace():
+                head = f.read(1)
+            f.seek(0)
+
+            if head == b'[':
+                documents = ijson.items(f, 'item', use_float=True)
+            else:
+                documents = [json_load_file(f)]
+            yield from resolve_embedding_refs(documents, file_path)
     except Exception as e:
         logger.error(f"Error loading {file_path}: {e}")
-        return []
 
-def verify_embeddings(documents):
+def sanitize_key(original_key, method='simple'):
+    """Sanitizes a single document key for Azure Search compatibility."""
+    # Use simple sanitization instead of base64 for better readability
+    if method == 'simple':
+        # Replace problematic characters but keep it readable
+        if original_key.isascii():
+            sanitized_key = original_key.translate(_ASCII_KEY_TABLE)
+        else:
+            sanitized_key = _INVALID_KEY_CHARS.sub('_', original_key)
+        # Ensure it doesn't start with underscore
+        if sanitized_key.startswith('_'):
+            sanitized_key = 'doc' + sanitized_key
+        # Ensure it's not too long (Azure Search key limit is 1024 chars)
+        if len(sanitized_key) > 900:
+            # blake2b rather than hash(), which is salted per process and would
+            # give the same document a different key on every run
+            sanitized_key = sanitized_key[:900] + '_' + hashlib.blake2b(original_key.encode('utf-8'), digest_size=4).hexdigest()
+    else:
+        # Fallback to base64 if needed
+        try:
+            sanitized_key = base64.urlsafe_b64encode(original_key.encode('utf-8')).rstrip(b'=').decode('utf-8')
+        except Exception as e:
+            logger.error(f"Base64 encoding failed for key '{original_key}': {e}. Using original key.")
+            sanitized_key = original_key
+
+    if sanitized_key != original_key:
+        logger.debug("Sanitized key (%s): '%s' -> '%s'", method, original_key, sanitized_key)
+    return sanitized_key
+
+def iter_document_batches(sized_documents, batch_size, max_batch_bytes=MAX_BATCH_BYTES):
     """
-    Verify that documents have embeddings.
-    
-    Args:
-        documents: List of document dictionaries
-        
-    Returns:
-        tuple: (documents with embeddings, documents missing embeddings)
+    Yield successive lists of at most ``batch_size`` documents whose combined
+    serialized size stays under ``max_batch_bytes``.
+
+    ``sized_documents`` yields ``(doc, nbytes)`` pairs, the size having been
+    taken when the document was serialized for its fingerprint. Vector fields
+    make documents large, so a fixed document count alone can exceed the
+    service's request size limit while small documents could pack far more
+    per request.
     """
-    with_embeddings = []
-    missing_embeddings = []
-    
-    for doc in documents:
-        if "chunk_vector" in doc and doc["chunk_vector"]:
-            with_embeddings.append(doc)
-        else:
-            missing_embeddings.append(doc)
-    
-    return with_embeddings, missing_embeddings
+    batch = []
+    batch_bytes = 0
+    for doc, doc_bytes in sized_documents:
+        if batch and (len(batch) >= batch_size or batch_bytes + doc_bytes > max_batch_bytes):
+            yield batch
+            batch = []
+            batch_bytes = 0
+        batch.append(doc)
+        batch_bytes += doc_bytes
+    if batch:
+        yield batch
 
-def sanitize_keys(documents, method='simple', key_field='id'):
-    """Sanitizes document keys for Azure Search compatibility."""
-    sanitized_documents = []
-    logger.debug(f"Sanitizing keys for {len(documents)} documents using method '{method}' on field '{key_field}'")
-    for i, doc in enumerate(documents):
-        doc_copy = doc.copy()
-        if key_field not in doc_copy:
-            logger.warning(f"Document at index {i} missing key field '{key_field}'. Skipping sanitization for this doc.")
-            sanitized_documents.append(doc_copy)
-            continue
+def upload_documents(index_name, sized_documents, batch_size=1000, max_concurrency=8):
+    """
+    Upload an iterable of ``(doc, nbytes)`` pairs in concurrent batches.
 
-        original_key = str(doc_copy[key_field])
-        
-        # Use simple sanitization instead of base64 for better readability
-        if method == 'simple':
-            # Replace problematic characters but keep it readable
-            sanitized_key = ''.join(c if c.isalnum() or c in '_-' else '_' for c in original_key)
-            # Ensure it doesn't start with underscore
-            if sanitized_key.startswith('_'):
-                sanitized_key = 'doc' + sanitized_key
-            # Ensure it's not too long (Azure Search key limit is 1024 chars)
-            if len(sanitized_key) > 900:
-                sanitized_key = sanitized_key[:900] + '_' + str(hash(original_key))[-8:]
-        else:
-            # Fallback to base64 if needed
-            try:
-                sanitized_key = base64.urlsafe_b64encode(original_key.encode('utf-8')).rstrip(b'=').decode('utf-8')
-            except Exception as e:
-                logger.error(f"Base64 encoding failed for key '{original_key}': {e}. Using original key.")
-                sanitized_key = original_key
+    Batches hold up to ``batch_size`` documents (capped at the service's 1000)
+    and are cut short before exceeding MAX_BATCH_BYTES of JSON.
+    Up to ``max_concurrency`` batches are in flight at once, each worker thread
+    flushing through its own SearchIndexingBufferedSender. The sender splits
+    batches the service rejects as too large (413) and retries throttled or
+    transient per-document failures.
 
-        if sanitized_key != original_key:
-            logger.debug(f"Sanitized key ({method}): '{original_key}' -> '{sanitized_key}'")
+    The sender reports failures through on_error without raising, and the
+    callback only gets the action, so a response hook records the status the
+    service returned for each document. Failures are logged per batch with
+    guidance for the status code.
+    """
+    batch_size = min(batch_size, MAX_BATCH_DOCS)
+    counts = Counter()
+    failed_keys = []
+    lock = threading.Lock()
+    local = threading.local()
+    senders = []
 
-        doc_copy[key_field] = sanitized_key
-        sanitized_documents.append(doc_copy)
+    def on_progress(action):
+        with lock:
+            counts["succeeded"] += 1
 
-    return sanitized_documents
+    def on_response(pipeline_response):
+        # Runs on the thread flushing the batch, like on_error, so the statuses
+        # are kept per thread. A partial success (207) reports a status per key;
+        # any other error status applies to every document in the request.
+        response = pipeline_response.http_response
+        if "search.index" not in response.request.url:
+            return
+        if response.status_code == 207:
+            for result in json_loads(response.body()).get("value", []):
+                if not result.get("status"):
+                    local.key_status[result.get("key")] = result.get("statusCode")
+        elif response.status_code >= 400:
+            local.request_status = response.status_code
 
-def map_legal_doc_to_standard_schema(doc):
-    """Map legal document fields to Azure Search OpenAI demo compatible schema."""
-    # Extract and preserve existing values, don't override with defaults
-    existing_category = doc.get("category", "")
-    existing_sourcepage = doc.get("sourcepage", "")
-    existing_sourcefile = doc.get("sourcefile", "")
-    existing_storage_url = doc.get("storageUrl", "")
-    
-    mapped_doc = {
-        # Core Azure Search OpenAI demo fields - preserve existing values
-        "id": doc.get("id", "unknown_doc"),
-        "content": doc.get("content", ""),
-        "embedding": doc.get("embedding", []),
-        
-        # Preserve existing category - don't override with default
-        "category": existing_category if existing_category else "Legal Document",
-        
-        # Preserve existing sourcepage - don't override with default  
-        "sourcepage": existing_sourcepage if existing_sourcepage else "Unknown Section",
-        
-        # Preserve existing sourcefile - don't override with default
-        "sourcefile": existing_sourcefile if existing_sourcefile else "Unknown Document",
-        
-        # Preserve existing storage URL
-        "storageUrl": existing_storage_url,
-        
-        # Handle arrays properly - ensure they're not None
-        "oids": doc.get("oids", []) if doc.get("oids") is not None else [],
-        "groups": doc.get("groups", []) if doc.get("groups") is not None else [],
-        "parent_id": doc.get("parent_id", ""),
-        "updated": doc.get("updated", "2024-01-01T00:00:00Z")
-    }
-    
-    # Ensure content is not empty
-    if not mapped_doc["content"]:
-        mapped_doc["content"] = f"Legal document: {mapped_doc['sourcefile']} - {mapped_doc['sourcepage']}"
-    
-    # Remove None values but keep empty strings and empty arrays
-    cleaned_doc = {}
-    for k, v in mapped_doc.items():
-        if v is not None:
-            cleaned_doc[k] = v
-    
-    return cleaned_doc
+    def on_error(action):
+        doc_id = action.additional_properties.get("id", "MISSING_ID")
+        local.failures[local.key_status.get(doc_id, local.request_status)] += 1
+        with lock:
+            counts["failed"] += 1
+            if len(failed_keys) < 3:  # Show first 3 errors
+                failed_keys.append(doc_id)
 
-def upload_documents(index_name, documents, batch_size=1000):
-    """Enhanced document upload using Azure SDK with better error handling and progress tracking."""
     try:
         # Get credentials using Azure Identity
         search_endpoint, credential = get_search_credentials()
-        
-        # Create search client for document operations
-        search_client = SearchClient(search_endpoint, index_name, credential)
-        
-        batch_count = 0
-        batch = []
-        total_uploaded = 0
-        total_docs = len(documents)
-        logger.info(f"Starting upload of {total_docs} documents...")
-
-        for i, doc in enumerate(documents):
-            batch.append(doc)
-            
-            if len(batch) >= batch_size or (i + 1) == total_docs:
-                batch_count += 1
-                logger.info(f"Uploading batch {batch_count} with {len(batch)} documents (Docs {total_uploaded + 1} to {i + 1}).")
-                
-                # Log first few IDs in the batch for tracing
-                batch_ids = [d.get('id', 'MISSING_ID') for d in batch[:3]]
-                logger.debug(f"Sample IDs in batch {batch_count}: {batch_ids}")
-                
-                try:
-                    # Upload using Azure SDK
-                    results = search_client.upload_documents(batch)
-                    
-                    # Analyze results
-                    successful_uploads = sum(1 for result in results if result.succeeded)
-                    failed_uploads = len(batch) - successful_uploads
-                    total_uploaded += successful_uploads
-                    
-                    logger.info(f"Batch {batch_count} complete: {successful_uploads} succeeded, {failed_uploads} failed")
-                    
-                    # Log errors in detail
-                    if failed_uploads > 0:
-                        errors = [result for result in results if not result.succeeded]
-                        for error_result in errors[:3]:  # Show first 3 errors
-                            logger.error(f"  Failed ID: {error_result.key}")
-                            logger.error(f"  Status: {error_result.status_code}")
-                            logger.error(f"  Message: {error_result.error_message}")
-                        
-                        if len(errors) > 3:
-                            logger.error(f"  ... and {len(errors) - 3} more errors in this batch")
 
-                except Exception as e:
-                    logger.error(f"Exception uploading batch {batch_count}: {e}")
-                    
-                    # Provide specific error guidance
-                    if "413" in str(e):
-                        logger.info("Batch too large. Try reducing --batch-size parameter")
-                    elif "429" in str(e):
-                        logger.info("Rate limited. Waiting before retry...")
-                        time.sleep(5)
-                    elif "400" in str(e):
-                        logger.info("Bad request. Check document format and field mappings")
-                    
-                    # Log sample document structure for debugging
-                    if batch:
-                        sample_doc = batch[0]
-                        logger.debug(f"Sample document structure: {list(sample_doc.keys())}")
-
-                batch = []  # Reset batch
-
-        logger.info(f"Upload complete: {total_uploaded}/{total_docs} documents uploaded successfully")
+        def upload_batch(batch):
+            sender = getattr(local, "sender", None)
+            if sender is None:
+                sender = local.sender = SearchIndexingBufferedSender(
+                    search_endpoint,
+                    index_name,
+                    credential,
+                    auto_flush=False,
+                    initial_batch_action_count=batch_size,
+                    on_progress=on_progress,
+                    on_error=on_error,
+                    raw_response_hook=on_response,
+                    transport=get_transport(),
+                )
+                with lock:
+                    senders.append(sender)
+            local.failures = Counter()
+            local.key_status = {}
+            local.request_status = None
+            sender.upload_documents(batch)
+            sender.flush()
+            return local.failures
+
+        logger.info(f"Starting upload ({max_concurrency} concurrent batches)...")
+        sample_keys = None
+
+        # The semaphore caps batches held in memory to those being uploaded
+        in_flight = threading.BoundedSemaphore(max_concurrency)
+        futures = []
+        try:
+            with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+                for batch in iter_document_batches(sized_documents, batch_size):
+                    if sample_keys is None:
+                        sample_keys = list(batch[0].keys())
+                    counts["submitted"] += len(batch)
+                    in_flight.acquire()
+                    future = executor.submit(upload_batch, batch)
+                    future.add_done_callback(lambda _: in_flight.release())
+                    futures.append(future)
+
+                for batch_count, future in enumerate(as_completed(futures), 1):
+                    try:
+                        failures = future.result()
+                    except Exception as e:
+                        logger.error(f"Exception uploading batch: {e}")
+                        continue
+                    logger.info("Batch %d/%d complete: %d/%d documents uploaded",
+                                batch_count, len(futures), counts['succeeded'], counts['submitted'])
+                    for status_code, failed in failures.items():
+                        logger.error("Batch %d: %d document(s) failed with status %s",
+                                     batch_count, failed, status_code or "unknown")
+
+                        # Provide specific error guidance
+                        if status_code in UPLOAD_ERROR_GUIDANCE:
+                            logger.info(UPLOAD_ERROR_GUIDANCE[status_code])
+
+                        # Log sample document structure for debugging
+                        logger.debug("Sample document structure: %s", sample_keys)
+        finally:
+            for sender in senders:
+                sender.close()
+
+        # Log errors in detail
+        if counts["failed"]:
+            for key in failed_keys:
+                logger.error(f"  Failed ID: {key}")
+            if counts["failed"] > len(failed_keys):
+                logger.error(f"  ... and {counts['failed'] - len(failed_keys)} more failed documents")
+
+        total_uploaded = counts["succeeded"]
+        logger.info(f"Upload complete: {total_uploaded}/{counts['submitted']} documents uploaded successfully")
         return total_uploaded
         
     except Exception as e:
         logger.error(f"Failed to upload documents: {e}")
-        return 0
+        return counts["succeeded"]
+
+def compute_metadata_fingerprint(doc):
+    """
+    Hash only the metadata part of a document's fingerprint.
+
+    Documents with equal fingerprints always have equal metadata fingerprints,
+    so this can be computed from a content-free projection to narrow down
+    which documents need their content compared.
+    """
+    fingerprint = hashlib.blake2b(digest_size=16)
+    for field in FINGERPRINT_METADATA_FIELDS:
+        value = doc.get(field)
+        if value:
+            fingerprint.update(str(value).encode('utf-8'))
+            fingerprint.update(b"|")
+    return fingerprint.digest()
 
 def compute_document_fingerprint(doc):
     """
@@ -479,75 +804,126 @@ def compute_document_fingerprint(doc):
     Returns:
         str: Document fingerprint as hash
     """
-    content_fields = ['content', 'chunk_content', 'text', 'chunk']
-    metadata_fields = ['title', 'source', 'case_number', 'document_type', 'section_title', 'parent_id', 'chunk_id']
-
-    content = ""
-    for field in content_fields:
-        if field in doc and doc[field]:
-            content = str(doc[field])
+    # Feed the fields to the hash one by one rather than building one long string
+    fingerprint = hashlib.blake2b(digest_size=16)
+    for field in FINGERPRINT_CONTENT_FIELDS:
+        value = doc.get(field)
+        if value:
+            fingerprint.update(str(value).encode('utf-8'))
             break
 
-    metadata = ""
-    for field in metadata_fields:
-        if field in doc and doc[field]:
-            metadata += str(doc[field]) + "|"
+    fingerprint.update(b"||")
+    for field in FINGERPRINT_METADATA_FIELDS:
+        value = doc.get(field)
+        if value:
+            fingerprint.update(str(value).encode('utf-8'))
+            fingerprint.update(b"|")
+
+    return fingerprint.hexdigest()
+
+def fetch_documents_by_id(search_client, ids, select):
+    """Yield the selected fields of the given documents, DUPLICATE_LOOKUP_BATCH ids per query."""
+    ids = iter(ids)
+    while batch := list(islice(ids, DUPLICATE_LOOKUP_BATCH)):
+        # Sanitized keys never contain ',' so it is safe as the search.in delimiter
+        id_filter = "search.in(id, '{}', ',')".format(",".join(batch))
+        yield from search_client.search(search_text="*", filter=id_filter, select=select)
+
+def iter_index_documents(search_client, select):
+    """
+    Yield the selected fields of every document in the index, in id order.
 
-    fingerprint_str = f"{content}||{metadata}"
-    return hashlib.md5(fingerprint_str.encode('utf-8')).hexdigest()
+    Pages are requested with an "id gt" filter on the last id seen rather
+    than $skip, which the service caps at 100,000 and which has no stable
+    order unless one is given. This needs the key field to be sortable; if
+    the service rejects the ordering, the scan falls back to unordered $skip
+    paging, which cannot reach documents past the first 100,000.
+    """
+    last_id = None
+    while True:
+        id_filter = None if last_id is None else "id gt '{}'".format(last_id.replace("'", "''"))
+        try:
+            page = list(search_client.search(search_text="*", select=select, filter=id_filter,
+                                             order_by=["id"], top=INDEX_SCAN_PAGE_SIZE))
+        except HttpResponseError as e:
+            if last_id is not None or e.status_code != 400:
+                raise
+            logger.warning(f"Index rejected ordering by id ({e}); paging without it, "
+                           f"so only the first 100,000 documents can be checked")
+            yield from search_client.search(search_text="*", select=select)
+            return
+        yield from page
+        if len(page) < INDEX_SCAN_PAGE_SIZE:
+            return
+        last_id = page[-1]["id"]
 
-def find_duplicates_in_azure_search(index_name, local_documents=None):
+def find_duplicates_in_azure_search(index_name, local_documents=None, valid_fields=None):
     """
     Find duplicate documents within Azure Search or between local documents and Azure Search using Azure SDK.
+
+    Runs in two phases so document content is only downloaded where it can
+    matter. The first pass scans the index in id order fetching ids and
+    fingerprint metadata only. Content is then fetched, by id, just for
+    documents whose metadata is shared by another indexed document or by a
+    local document.
     """
     logger.info("Checking for duplicates in Azure Search index...")
     
     try:
-        # Get credentials using Azure Identity
-        search_endpoint, credential = get_search_credentials()
+        search_client = get_search_client(index_name)
+        
+        # Only project fingerprint fields the index defines, so local and
+        # indexed documents are fingerprinted from the same fields
+        if valid_fields is None:
+            valid_fields, _ = get_index_fields(index_name)
+        metadata_fields = [f for f in FINGERPRINT_METADATA_FIELDS
+                           if f in (valid_fields if valid_fields is not None else DUPLICATE_DEFAULT_FIELDS)]
         
-        # Create search client for document operations
-        search_client = SearchClient(search_endpoint, index_name, credential)
+        local_groups = set()
+        if local_documents:
+            local_groups = {compute_metadata_fingerprint(doc) for doc in local_documents}
         
-        azure_docs = []
+        azure_fingerprints = {}
+        azure_duplicates = {}
+        retrieved_count = 0
         
-        # Get all documents from the index
         try:
-            results = search_client.search(
-                search_text="*",
-                select=["id", "content", "title", "category", "sourcefile"],
-                include_total_count=True,
-                top=1000
-            )
+            # Phase 1: ids and metadata only, grouped by metadata fingerprint
+            metadata_groups = {}
+            for doc in iter_index_documents(search_client, ["id"] + metadata_fields):
+                retrieved_count += 1
+                metadata_groups.setdefault(compute_metadata_fingerprint(doc), []).append(doc["id"])
+            
+            candidate_ids = [
+                doc_id
+                for group, ids in metadata_groups.items()
+                if len(ids) > 1 or group in local_groups
+                for doc_id in ids
+            ]
+            del metadata_groups
+            logger.info(f"Retrieved {retrieved_count} documents from Azure Search; "
+                        f"comparing content of {len(candidate_ids)} candidates")
             
-            # Process results in batches
-            for result in results:
-                azure_docs.append(result)
+            # Phase 2: full fingerprints for the candidates
+            for doc in fetch_documents_by_id(search_client, candidate_ids, ["id", "content"] + metadata_fields):
+                fingerprint = compute_document_fingerprint(doc)
+                
+                if fingerprint not in azure_fingerprints:
+                    azure_fingerprints[fingerprint] = []
+                
+                azure_fingerprints[fingerprint].append({
+                    "id": doc.get("id", "unknown"),
+                    "title": doc.get("title", ""),
+                    "content_preview": doc.get("content", "")[:100] if doc.get("content") else ""
+                })
+                
+                if len(azure_fingerprints[fingerprint]) > 1:
+                    azure_duplicates[fingerprint] = azure_fingerprints[fingerprint]
                 
         except Exception as e:
             logger.error(f"Error retrieving documents: {e}")
             return {"azure_duplicates": {}, "local_vs_azure_duplicates": {}}
         
-        logger.info(f"Retrieved {len(azure_docs)} documents from Azure Search")
-        
-        azure_fingerprints = {}
-        azure_duplicates = {}
-        
-        for doc in azure_docs:
-            fingerprint = compute_document_fingerprint(doc)
-            
-            if fingerprint not in azure_fingerprints:
-                azure_fingerprints[fingerprint] = []
-            
-            azure_fingerprints[fingerprint].append({
-                "id": doc.get("id", "unknown"),
-                "title": doc.get("title", ""),
-                "content_preview": doc.get("content", "")[:100] if doc.get("content") else ""
-            })
-            
-            if len(azure_fingerprints[fingerprint]) > 1:
-                azure_duplicates[fingerprint] = azure_fingerprints[fingerprint]
-        
         local_vs_azure_duplicates = {}
         
         if local_documents:
@@ -635,18 +1011,17 @@ def generate_duplicates_report(duplicates):
     
     return "\n".join(report)
 
-def delete_duplicate_documents(index_name, duplicates, strategy="keep_first"):
+def delete_duplicate_documents(index_name, duplicates, strategy="keep_first", upload_cache=None):
     """
     Delete duplicate documents from Azure Search using Azure SDK.
+
+    Deleted documents are forgotten by ``upload_cache``, if given, so a later
+    upload sends them again instead of skipping them as unchanged.
     """
     logger.info(f"Deleting duplicate documents using strategy: {strategy}")
     
     try:
-        # Get credentials using Azure Identity
-        search_endpoint, credential = get_search_credentials()
-        
-        # Create search client for document operations
-        search_client = SearchClient(search_endpoint, index_name, credential)
+        search_client = get_search_client(index_name)
         
         docs_to_delete = []
         
@@ -660,24 +1035,31 @@ def delete_duplicate_documents(index_name, duplicates, strategy="keep_first"):
                 docs_to_delete.extend([doc["id"] for doc in docs[:-1]])
         
         deleted_count = 0
-        batch_size = 100
-        
-        for i in range(0, len(docs_to_delete), batch_size):
-            batch = docs_to_delete[i:i+batch_size]
-            
-            try:
-                delete_docs = [{"id": doc_id} for doc_id in batch]
-                results = search_client.delete_documents(delete_docs)
-                
-                success_count = sum(1 for r in results if r.succeeded)
-                deleted_count += success_count
-                
-                logger.info(f"Deleted batch {i//batch_size + 1}: {success_count} documents")
-                
-                time.sleep(0.2)
-                
-            except Exception as e:
-                logger.error(f"Error deleting batch starting at index {i}: {e}")
+        batch_size = MAX_BATCH_DOCS
+
+        def delete_batch(batch):
+            # Delete actions only need the key field
+            results = search_client.delete_documents([{"id": doc_id} for doc_id in batch])
+            deleted_ids = [r.key for r in results if r.succeeded]
+            if upload_cache is not None:
+                upload_cache.forget_documents(index_name, deleted_ids)
+            return len(deleted_ids)
+
+        # Throttled (429/503) requests are retried by the client's retry
+        # policy, which honours Retry-After, so batches are sent back to back
+        with ThreadPoolExecutor(max_workers=DELETE_CONCURRENCY) as executor:
+            futures = {
+                executor.submit(delete_batch, docs_to_delete[i:i+batch_size]): i
+                for i in range(0, len(docs_to_delete), batch_size)
+            }
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    success_count = future.result()
+                    deleted_count += success_count
+                    logger.info(f"Deleted batch {i//batch_size + 1}: {success_count} documents")
+                except Exception as e:
+                    logger.error(f"Error deleting batch starting at index {i}: {e}")
         
         logger.info(f"Total documents deleted: {deleted_count}")
         return deleted_count
@@ -687,84 +1069,101 @@ def delete_duplicate_documents(index_name, duplicates, strategy="keep_first"):
         return 0
 
 def map_legal_doc_to_standard_schema(doc):
-    """Map legal document fields to Azure Search OpenAI demo compatible schema."""
+    """
+    Map legal document fields to Azure Search OpenAI demo compatible schema.
+
+    Every field gets a non-None value (missing or null source fields take
+    their default), so the result always has the full set of fields.
+    """
+    # Runs once per document, so each source field is read exactly once
+    get = doc.get
     # Extract and preserve existing values, don't override with defaults
-    existing_category = doc.get("category", "")
-    existing_sourcepage = doc.get("sourcepage", "")
-    existing_sourcefile = doc.get("sourcefile", "")
-    existing_storage_url = doc.get("storageUrl", "")
+    category = get("category") or _DEFAULT_CATEGORY
+    sourcepage = get("sourcepage") or _DEFAULT_SOURCEPAGE
+    sourcefile = get("sourcefile") or _DEFAULT_SOURCEFILE
+    doc_id = get("id")
+    embedding = get("embedding")
+    storage_url = get("storageUrl")
+    oids = get("oids")
+    groups = get("groups")
+    parent_id = get("parent_id")
+    updated = get("updated")
     
-    mapped_doc = {
+    # Ensure content is not empty
+    content = get("content") or f"Legal document: {sourcefile} - {sourcepage}"
+    
+    return {
         # Core Azure Search OpenAI demo fields - preserve existing values
-        "id": doc.get("id", "unknown_doc"),
-        "content": doc.get("content", ""),
-        "embedding": doc.get("embedding", []),
-        
-        # Preserve existing category - don't override with default
-        "category": existing_category if existing_category else "Legal Document",
+        "id": doc_id if doc_id is not None else _DEFAULT_ID,
+        "content": content,
+        "embedding": embedding if embedding is not None else [],
         
-        # Preserve existing sourcepage - don't override with default  
-        "sourcepage": existing_sourcepage if existing_sourcepage else "Unknown Section",
-        
-        # Preserve existing sourcefile - don't override with default
-        "sourcefile": existing_sourcefile if existing_sourcefile else "Unknown Document",
+        # Preserve existing category, sourcepage and sourcefile - only fall
+        # back to the defaults when they are missing or empty
+        "category": category,
+        "sourcepage": sourcepage,
+        "sourcefile": sourcefile,
         
         # Preserve existing storage URL
-        "storageUrl": existing_storage_url,
+        "storageUrl": storage_url if storage_url is not None else "",
         
         # Handle arrays properly - ensure they're not None
-        "oids": doc.get("oids", []) if doc.get("oids") is not None else [],
-        "groups": doc.get("groups", []) if doc.get("groups") is not None else [],
-        "parent_id": doc.get("parent_id", ""),
-        "updated": doc.get("updated", "2024-01-01T00:00:00Z")
+        "oids": oids if oids is not None else [],
+        "groups": groups if groups is not None else [],
+        "parent_id": parent_id if parent_id is not None else "",
+        "updated": updated if updated is not None else _DEFAULT_UPDATED
     }
-    
-    # Ensure content is not empty
-    if not mapped_doc["content"]:
-        mapped_doc["content"] = f"Legal document: {mapped_doc['sourcefile']} - {mapped_doc['sourcepage']}"
-    
-    # Remove None values but keep empty strings and empty arrays
-    cleaned_doc = {}
-    for k, v in mapped_doc.items():
-        if v is not None:
-            cleaned_doc[k] = v
-    
-    return cleaned_doc
 
-def validate_document_schema(documents, index_name):
+# Fields every mapped document carries
+STANDARD_SCHEMA_FIELDS = frozenset(map_legal_doc_to_standard_schema({}))
+
+@functools.lru_cache(maxsize=1)
+def half_float_table():
+    """Shortest float that round-trips to each float16 value, indexed by its bits."""
+    return np.arange(1 << 16, dtype=np.uint16).view(np.float16).astype(str).astype(np.float64)
+
+def compact_half_embedding(embedding):
     """
-    Validate and filter document fields against the actual index schema.
-    Only keeps fields that exist in the target index.
+    Round an embedding to float16 and return the shortest floats that still
+    round-trip to the same float16 values.
+
+    A Collection(Edm.Half) field stores float16 anyway, so this loses nothing
+    the index would keep while cutting the JSON for each vector by about 55%.
+    Formatting every value as a string costs ~3 ms per 3072-dim vector, so the
+    shortest forms of all 65536 float16 values are looked up from a table
+    built once instead.
+    """
+    half = np.asarray(embedding, dtype=np.float16)
+    return half_float_table()[half.view(np.uint16)].tolist()
+
+@functools.lru_cache(maxsize=8)
+def _get_index_schema(index_name):
+    """Fetch an index's field names and embedding type once per run."""
+    index_schema = get_index_client().get_index(index_name)
+
+    # Get valid field names from the index
+    valid_fields = frozenset(field.name for field in index_schema.fields)
+    logger.info(f"Valid fields in index '{index_name}': {sorted(valid_fields)}")
+    half_embedding = any(
+        field.name == 'embedding' and field.type == "Collection(Edm.Half)" for field in index_schema.fields
+    )
+    return valid_fields, half_embedding
+
+def get_index_fields(index_name):
+    """
+    Read the target index schema. The schema is fetched once per index and
+    reused for every file; a failed fetch is retried on the next call.
+
+    Returns:
+        tuple: (frozenset of field names, whether 'embedding' is a
+        Collection(Edm.Half) field), or (None, False) if the schema can't be read
     """
     try:
-        # Get credentials and index schema
-        search_endpoint, credential = get_search_credentials()
-        index_client = SearchIndexClient(search_endpoint, credential)
-        index_schema = index_client.get_index(index_name)
-        
-        # Get valid field names from the index
-        valid_fields = set(field.name for field in index_schema.fields)
-        logger.info(f"Valid fields in index '{index_name}': {sorted(valid_fields)}")
-        
-        # Filter documents to only include valid fields
-        filtered_documents = []
-        for doc in documents:
-            filtered_doc = {k: v for k, v in doc.items() if k in valid_fields}
-            
-            # Log removed fields for debugging
-            removed_fields = set(doc.keys()) - valid_fields
-            if removed_fields:
-                logger.debug(f"Removed invalid fields from document {doc.get('id', 'unknown')}: {sorted(removed_fields)}")
-            
-            filtered_documents.append(filtered_doc)
-        
-        logger.info(f"✅ Filtered {len(documents)} documents to match index schema")
-        return filtered_documents
-        
+        return _get_index_schema(index_name)
     except Exception as e:
         logger.error(f"Failed to validate document schema: {e}")
         logger.warning("Proceeding with original documents - may cause upload errors")
-        return documents
+        return None, False
 
 def validate_json_documents(documents, embedding_dim=3072):  # Updated default
     """
@@ -774,156 +1173,206 @@ def validate_json_documents(documents, embedding_dim=3072):  # Updated default
     """
     errors = []
     for i, doc in enumerate(documents):
-        doc_id = doc.get("id", f"doc_{i}")
+        # Look each field up once and classify the document in a single pass
+        doc_id = doc.get("id")
+        embedding = doc.get("embedding")
         # Check required fields
-        if "id" not in doc or not doc["id"]:
+        if not doc_id:
             errors.append(f"Document {i} missing 'id' field.")
-        if "content" not in doc or not doc["content"]:
+            doc_id = f"doc_{i}"
+        if not doc.get("content"):
             errors.append(f"Document {doc_id} missing or empty 'content' field.")
-        if "embedding" not in doc or not isinstance(doc["embedding"], list):
+        if not isinstance(embedding, list):
             errors.append(f"Document {doc_id} missing or invalid 'embedding' field.")
-        elif len(doc["embedding"]) != embedding_dim:
-            errors.append(f"Document {doc_id} embedding length {len(doc['embedding'])} != {embedding_dim}.")
+        elif len(embedding) != embedding_dim:
+            errors.append(f"Document {doc_id} embedding length {len(embedding)} != {embedding_dim}.")
     return (len(errors) == 0), errors
 
-def process_file(file_path, index_name, batch_size=100, skip_missing_vectors=False, upload_cache=None, 
-                check_azure_duplicates=False, force=False, embedding_dim=3072):  # Updated default
-    """Enhanced file processing with field mapping to standard schema."""
-    if upload_cache is None:
-        upload_cache = {}
-    
-    # Only check hash if not forcing
-    if not force and not file_has_changed(file_path, upload_cache):
-        return 0, 0
-    # If force, update the cache with the current hash so future runs are correct
-    if force:
-        upload_cache[file_path] = compute_file_hash(file_path)
+def prepare_documents(documents, stats, embedding_dim=3072, skip_missing_vectors=False,
+                      valid_fields=None, half_embedding=False):
+    """
+    Turn loaded documents into upload-ready documents in a single pass.
 
-    documents = load_documents_from_file(file_path)
-    if not documents:
-        logger.warning(f"No documents found in {file_path}")
-        return 0, 0
+    Each document is mapped to the standard schema, checked for a usable
+    embedding, given a sanitized key and trimmed to the index's
+    ``valid_fields`` (None keeps every field). Documents whose embedding has
+    the wrong dimension are dropped, since the index would reject them, and
+    so are documents without one when ``skip_missing_vectors`` is set.
+    ``stats`` counts loaded, mapped, invalid, accepted, missing-vector and
+    wrong-dimension documents.
+    """
+    # Every mapped document has the standard schema's fields, so which of
+    # them the index lacks is worked out once instead of per document
+    removed_fields = ()
+    if valid_fields is not None:
+        removed_fields = tuple(STANDARD_SCHEMA_FIELDS - valid_fields)
+        if removed_fields:
+            logger.debug("Removing fields the index doesn't define: %s", sorted(removed_fields))
 
-    logger.info(f"Loaded {len(documents)} documents from {file_path}")
-    
-    # Enhanced document validation and mapping
-    valid_documents = []
-    invalid_count = 0
-    
     for i, doc in enumerate(documents):
+        stats["loaded"] += 1
         if not isinstance(doc, dict):
             logger.warning(f"Document {i} is not a dictionary, skipping")
-            invalid_count += 1
+            stats["invalid"] += 1
             continue
             
-        if 'id' not in doc:
+        if doc.get('id') is None:
             logger.warning(f"Document {i} missing 'id' field, skipping")
-            invalid_count += 1
+            stats["invalid"] += 1
             continue
         
         # Map to standard schema
         try:
             mapped_doc = map_legal_doc_to_standard_schema(doc)
-            valid_documents.append(mapped_doc)
         except Exception as e:
             logger.warning(f"Failed to map document {i}: {e}")
-            invalid_count += 1
+            stats["invalid"] += 1
             continue
+
+        stats["mapped"] += 1
+        if stats["mapped"] == 1 and logger.isEnabledFor(logging.DEBUG):
+            # Log sample document for debugging
+            logger.debug("Sample document fields: %s", list(mapped_doc.keys()))
+            logger.debug("Sample ID: %s", mapped_doc.get('id'))
+            logger.debug("Sample category: %s", mapped_doc.get('category'))
+            logger.debug("Sample sourcepage: %s", mapped_doc.get('sourcepage'))
+            logger.debug("Sample sourcefile: %s", mapped_doc.get('sourcefile'))
+
+        # Verify embeddings using the mapped field name
+        embedding = mapped_doc.get("embedding")
+        if not embedding:
+            stats["missing_vectors"] += 1
+            if skip_missing_vectors:
+                continue
+            # Counted here and reported once per file by process_file
+            logger.debug("Document %s is missing or has empty 'embedding' field before upload!", mapped_doc.get('id', 'unknown'))
+        elif len(embedding) != embedding_dim:
+            stats["wrong_dimension"] += 1
+            if stats["wrong_dimension"] <= 5:
+                logger.error(f"  Document {mapped_doc.get('id', 'unknown')} embedding length: {len(embedding)} (expected {embedding_dim})")
+            continue
+
+        # Sanitize keys before uploading - use simple method for readability.
+        # mapped_doc is already a fresh dict, so it is safe to update in place.
+        mapped_doc["id"] = sanitize_key(str(mapped_doc["id"]), method='simple')
+
+        # Validate document schema against index before upload
+        for k in removed_fields:
+            mapped_doc.pop(k, None)
+        if half_embedding and embedding:
+            mapped_doc["embedding"] = compact_half_embedding(embedding)
+
+        stats["accepted"] += 1
+        yield mapped_doc
+
+def skip_unchanged_documents(documents, index_name, upload_cache, stats, fingerprints, force=False):
+    """
+    Drop documents that were already uploaded to ``index_name`` exactly as they are now.
+
+    Each document is serialized once: its fingerprint is a short digest of
+    the JSON bytes, and the byte count is yielded with it as ``(doc, nbytes)``
+    for batching. Fingerprints of the documents passed through are added to
+    ``fingerprints`` so the caller can record them once the upload has
+    succeeded. With ``force`` nothing is skipped, but fingerprints are still
+    collected. ``stats`` counts skipped documents as "unchanged".
+    """
+    for doc in documents:
+        data = json_dumps(doc)
+        doc_id = doc.get("id")
+        if doc_id is not None:
+            fingerprint = hashlib.blake2b(data, digest_size=8).digest()
+            if not force and upload_cache.document_unchanged(index_name, doc_id, fingerprint):
+                stats["unchanged"] += 1
+                continue
+            fingerprints[doc_id] = fingerprint
+        yield doc, len(data)
+
+def process_file(file_path, index_name, batch_size=100, skip_missing_vectors=False, upload_cache=None, 
+                check_azure_duplicates=False, force=False, embedding_dim=3072, max_concurrency=8,
+                file_hash=None):  # Updated default
+    """
+    Enhanced file processing with field mapping to standard schema.
+
+    Documents stream from the file through prepare_documents straight into
+    the upload, so only the batches being uploaded are held in memory. ``file_hash`` is the file's
+    precomputed compute_file_hash value, if already known. Documents
+    uploaded unchanged by an earlier run are skipped unless ``force`` is set.
+    """
+    if upload_cache is None:
+        upload_cache = UploadCache(":memory:")
     
-    documents = valid_documents
-    
-    if invalid_count > 0:
-        logger.warning(f"Skipped {invalid_count} invalid documents")
-    
-    logger.info(f"✅ Mapped {len(documents)} documents to Azure Search OpenAI demo schema")
-    
-    # Log sample document for debugging
-    if documents:
-        sample_doc = documents[0]
-        logger.info(f"Sample document fields: {list(sample_doc.keys())}")
-        logger.info(f"Sample ID: {sample_doc.get('id')}")
-        logger.info(f"Sample category: {sample_doc.get('category')}")
-        logger.info(f"Sample sourcepage: {sample_doc.get('sourcepage')}")
-        logger.info(f"Sample sourcefile: {sample_doc.get('sourcefile')}")
+    # Only check hash if not forcing
+    if not force and not file_has_changed(file_path, upload_cache, file_hash):
+        return 0, 0
+    # If force, update the cache with the current hash so future runs are correct
+    if force:
+        upload_cache[file_path] = file_hash or compute_file_hash(file_path)
+
+    valid_fields, half_embedding = get_index_fields(index_name)
+    stats = Counter()
+    documents = prepare_documents(
+        load_documents_from_file(file_path), stats, embedding_dim, skip_missing_vectors,
+        valid_fields, half_embedding
+    )
     
-    # Check for duplicates if requested
+    # Check for duplicates if requested (this needs every local document up front)
     if check_azure_duplicates:
-        duplicates = find_duplicates_in_azure_search(index_name, documents)
+        documents = list(documents)
+        duplicates = find_duplicates_in_azure_search(index_name, documents, valid_fields)
         
         if duplicates["local_vs_azure_duplicates"]:
             logger.warning(f"Found {len(duplicates['local_vs_azure_duplicates'])} documents already in Azure Search")
             
-            duplicate_ids = set()
-            for info in duplicates["local_vs_azure_duplicates"].values():
-                duplicate_ids.add(info["local_doc"]["id"])
+            duplicate_ids = {info["local_doc"]["id"] for info in duplicates["local_vs_azure_duplicates"].values()}
             
             logger.info(f"Filtering out {len(duplicate_ids)} duplicate documents")
-            documents = [doc for doc in documents if doc.get("id") not in duplicate_ids]
-    
-    # Verify embeddings using the mapped field name
-    docs_with_vectors = [doc for doc in documents if doc.get("embedding") and len(doc.get("embedding", [])) > 0]
-    docs_missing_vectors = [doc for doc in documents if not doc.get("embedding") or len(doc.get("embedding", [])) == 0]
-    
-    if docs_missing_vectors:
-        logger.warning(f"{len(docs_missing_vectors)} documents missing embeddings")
-        if skip_missing_vectors:
-            logger.info(f"Skipping documents without embeddings")
-            documents = docs_with_vectors
-        else:
-            logger.info(f"Including documents without embeddings (they won't be vector searchable)")
-    
-    if not documents:
-        logger.warning(f"No valid documents to upload from {file_path}")
-        return 0, 0
-    
-    # Sanitize keys before uploading - use simple method for readability
-    documents = sanitize_keys(documents, method='simple')
-    
-    # Validate document schema against index before upload
-    documents = validate_document_schema(documents, index_name)
+            kept = [doc for doc in documents if doc.get("id") not in duplicate_ids]
+            stats["duplicates"] = len(documents) - len(kept)
+            documents = kept
 
-    # --- Check embedding field dimension before upload ---
-    wrong_dim_docs = []
-    for doc in documents:
-        emb = doc.get("embedding")
-        if emb is not None and isinstance(emb, list) and len(emb) > 0 and len(emb) != embedding_dim:
-            wrong_dim_docs.append((doc.get("id", "unknown"), len(emb)))
-    if wrong_dim_docs:
-        logger.error(f"❌ Found {len(wrong_dim_docs)} documents with incorrect embedding dimension (expected {embedding_dim}):")
-        for doc_id, dim in wrong_dim_docs[:5]:
-            logger.error(f"  Document {doc_id} embedding length: {dim}")
-        logger.error("Aborting upload for this file due to embedding dimension mismatch.")
-        return 0, len(documents)
-
-    # --- DEBUG: Check embedding field before upload ---
-    if documents:
-        sample_doc = documents[0]
-        logger.debug(f"Sample document keys before upload: {list(sample_doc.keys())}")
-        embedding = sample_doc.get("embedding")
-        logger.debug(f"Sample 'embedding' field type: {type(embedding)}, length: {len(embedding) if isinstance(embedding, list) else 'N/A'}")
-        # Warn if embedding is missing or empty
-        if embedding is None or (isinstance(embedding, list) and not embedding):
-            logger.warning(f"Sample document is missing or has empty 'embedding' field before upload!")
-
-    # Warn if any document is missing or has empty embedding
-    for doc in documents:
-        if "embedding" not in doc or not isinstance(doc["embedding"], list) or not doc["embedding"]:
-            logger.warning(f"Document {doc.get('id', 'unknown')} is missing or has empty 'embedding' field before upload!")
+    fingerprints = {}
+    sized_documents = skip_unchanged_documents(documents, index_name, upload_cache, stats, fingerprints, force)
 
-    # Upload documents using REST API
     try:
-        success_count = upload_documents(index_name, documents, batch_size)
-        error_count = len(documents) - success_count
-        
-        return success_count, error_count
-        
+        success_count = upload_documents(index_name, sized_documents, batch_size, max_concurrency)
     except Exception as e:
         logger.error(f"Failed to upload documents: {e}")
-        return 0, len(documents)
+        success_count = 0
+
+    # Only trust the fingerprints if every document made it into the index;
+    # otherwise the next run uploads this file's documents again
+    if stats["accepted"] - stats["duplicates"] - stats["unchanged"] == success_count:
+        upload_cache.record_documents(index_name, fingerprints)
+
+    if not stats["loaded"]:
+        logger.warning(f"No documents found in {file_path}")
+        return 0, 0
+
+    logger.info(f"Loaded {stats['loaded']} documents from {file_path}")
+    if stats["invalid"]:
+        logger.warning(f"Skipped {stats['invalid']} invalid documents")
+    logger.info(f"✅ Mapped {stats['mapped']} documents to Azure Search OpenAI demo schema")
+    if stats["unchanged"]:
+        logger.info(f"Skipped {stats['unchanged']} documents unchanged since the last upload")
+
+    if stats["missing_vectors"]:
+        logger.warning(f"{stats['missing_vectors']} documents missing embeddings")
+        if skip_missing_vectors:
+            logger.info(f"Skipped documents without embeddings")
+        else:
+            logger.info(f"Included documents without embeddings (they won't be vector searchable)")
+    if stats["wrong_dimension"]:
+        logger.error(f"❌ Skipped {stats['wrong_dimension']} documents with incorrect embedding dimension (expected {embedding_dim})")
+
+    if not stats["accepted"]:
+        logger.warning(f"No valid documents to upload from {file_path}")
+    
+    error_count = stats["accepted"] - stats["duplicates"] - stats["unchanged"] - success_count + stats["wrong_dimension"]
+    return success_count, error_count
 
 def upload_documents_with_embeddings(index_name, base_processed_dir, file_pattern, batch_size=100, 
                                     force_upload=False, embedding_model="text-embedding-3-large", 
-                                    max_tokens=8191):
+                                    max_tokens=8191, max_concurrency=8, file_concurrency=4):
     """
     Upload documents with embeddings to Azure Search.
     
@@ -935,6 +1384,8 @@ def upload_documents_with_embeddings(index_name, base_processed_dir, file_patter
         force_upload: Force upload even if files haven't changed
         embedding_model: OpenAI embedding model to use
         max_tokens: Maximum tokens per document
+        max_concurrency: Number of batches uploaded concurrently per file
+        file_concurrency: Number of files processed concurrently
     """
     logger.info(f"Starting upload to index: {index_name}")
     logger.info(f"File pattern: {file_pattern}")
@@ -949,40 +1400,91 @@ def upload_documents_with_embeddings(index_name, base_processed_dir, file_patter
     
     logger.info(f"Found {len(json_files)} JSON files to process")
     
-    # Load upload cache
+    # Every concurrent batch of every concurrent file holds a connection
+    configure_http_pool(max(1, file_concurrency) * max_concurrency)
+    
+    # Load upload cache. Files whose size and mtime match the cache reuse the
+    # cached hash; only new or modified files are read and hashed.
     upload_cache = load_upload_cache()
+    file_stats = {}
+    file_hashes = {}
+    for file_path in json_files:
+        try:
+            file_stats[file_path] = os.stat(file_path)
+        except OSError:
+            continue
+        cached_hash = upload_cache.unchanged_hash(file_path, file_stats[file_path])
+        if cached_hash is not None:
+            file_hashes[file_path] = cached_hash
+    to_hash = [f for f in json_files if f not in file_hashes]
+    logger.info(f"Hashing {len(to_hash)} new or modified files")
+    file_hashes.update(compute_file_hashes(to_hash))
+    to_hash_set = set(to_hash)
     
     total_success = 0
     total_errors = 0
     files_processed = 0
     
-    try:
+    # Files are processed concurrently so that many small files, each a
+    # single batch, still keep several uploads in flight
+    with ThreadPoolExecutor(max_workers=max(1, file_concurrency)) as executor:
+        futures = {}
         for file_path in json_files:
-            logger.info(f"📄 Processing file: {os.path.basename(file_path)}")
-            
-            success_count, error_count = process_file(
+            future = executor.submit(
+                process_file,
                 file_path, 
                 index_name, 
                 batch_size, 
                 skip_missing_vectors=False,
                 upload_cache=upload_cache,
                 check_azure_duplicates=False,
-                force=force_upload
+                force=force_upload,
+                max_concurrency=max_concurrency,
+                file_hash=file_hashes.get(file_path)
             )
-            
-            total_success += success_count
-            total_errors += error_count
-            files_processed += 1
-            
-            logger.info(f"✅ File complete: {success_count} uploaded, {error_count} errors")
-            
-            # Save cache after each file
+            futures[future] = file_path
+        
+        files_since_save = 0
+        last_save = time.monotonic()
+        try:
+            for future in as_completed(futures):
+                file_path = futures[future]
+                success_count, error_count = future.result()
+                
+                total_success += success_count
+                total_errors += error_count
+                files_processed += 1
+                
+                if success_count or error_count:
+                    logger.info(f"✅ File complete: {os.path.basename(file_path)}: {success_count} uploaded, {error_count} errors")
+                
+                # Remember the stat the hash was computed from
+                # (a failed hash must not be trusted on the next run)
+                if (file_path in to_hash_set and file_path in file_stats
+                        and not file_hashes[file_path].startswith("error_hash_")):
+                    upload_cache.record(file_path, file_hashes[file_path], file_stats[file_path])
+                
+                # Each save is a transaction, so save every few files or
+                # seconds rather than after every file
+                files_since_save += 1
+                if (files_since_save >= CACHE_SAVE_INTERVAL_FILES
+                        or time.monotonic() - last_save >= CACHE_SAVE_INTERVAL_SECONDS):
+                    save_upload_cache(upload_cache)
+                    files_since_save = 0
+                    last_save = time.monotonic()
+                
+        except KeyboardInterrupt:
+            logger.info("\n🛑 Upload interrupted by user, waiting for files in progress to finish")
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+            return
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+        finally:
             save_upload_cache(upload_cache)
-            
-    except KeyboardInterrupt:
-        logger.info("\n🛑 Upload interrupted by user")
-        save_upload_cache(upload_cache)
-        return
     
     logger.info(f"\n🎉 Upload complete!")
     logger.info(f"📊 Summary: {files_processed} files processed, {total_success} documents uploaded, {total_errors} errors")
@@ -991,17 +1493,27 @@ def main():
     parser = argparse.ArgumentParser(description="Upload legal document chunks with embeddings to Azure Search")
     parser.add_argument("--input", default="Upload-flattened", help="Input file pattern (e.g., 'Upload-flattened', 'Upload', 'civil_rules')")
     parser.add_argument("--index", default="legal-court-rag-index", help="Azure Search index name")
-    parser.add_argument("--batch-size", type=int, default=100, help="Batch size for uploading")
+    parser.add_argument("--batch-size", type=int, default=100, help="Maximum documents per upload batch (batches are also capped by size)")
+    parser.add_argument("--max-concurrency", type=int, default=8, help="Number of batches uploaded concurrently per file")
+    parser.add_argument("--file-concurrency", type=int, default=4, help="Number of files processed concurrently")
     parser.add_argument("--processed-dir", help="Directory containing processed files")
     parser.add_argument("--skip-missing-vectors", action="store_true", help="Skip documents without vector embeddings")
-    parser.add_argument("--force", action="store_true", help="Force upload even if file unchanged")
+    parser.add_argument("--force", action="store_true", help="Force upload even if the file or its documents are unchanged")
     parser.add_argument("--find-azure-duplicates", action="store_true", help="Find duplicate documents in Azure Search")
     parser.add_argument("--check-azure-duplicates", action="store_true", help="Check for duplicates in Azure before uploading")
     parser.add_argument("--delete-duplicates", choices=["keep_first", "keep_last"], help="Delete duplicate documents in Azure Search, keeping either first or last occurrence")
     parser.add_argument("--report-file", help="Save duplicate report to a file")
     parser.add_argument("--upload-flattened", action="store_true", help="Upload flattened files from Upload directory")
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument("--verbose", action="store_true", help="Log per-file and per-document details")
+    verbosity.add_argument("--quiet", action="store_true", help="Only log warnings and errors (for large bulk runs)")
     
     args = parser.parse_args()
+
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+    elif args.quiet:
+        logging.getLogger().setLevel(logging.WARNING)
     
     # Handle upload-flattened flag
     if args.upload_flattened:
@@ -1029,7 +1541,9 @@ def main():
                 logger.info(f"📄 Duplicate report saved to: {args.report_file}")
             
             if args.delete_duplicates:
-                delete_duplicate_documents(args.index, duplicates, args.delete_duplicates)
+                upload_cache = load_upload_cache()
+                delete_duplicate_documents(args.index, duplicates, args.delete_duplicates, upload_cache)
+                save_upload_cache(upload_cache)
         else:
             logger.info("✅ No duplicates found in Azure Search")
         
@@ -1047,7 +1561,9 @@ def main():
         base_processed_dir=base_processed_dir,
         file_pattern=args.input,
         batch_size=args.batch_size,
-        force_upload=args.force
+        force_upload=args.force,
+        max_concurrency=args.max_concurrency,
+        file_concurrency=args.file_concurrency
     )
 
 if __name__ == "__main__":
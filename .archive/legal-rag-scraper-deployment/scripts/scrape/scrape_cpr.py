@@ -1,18 +1,63 @@
 import concurrent.futures
-import requests
-from bs4 import BeautifulSoup
+import contextlib
+import io
 import re
 import json
-import time
 import uuid
 import os
 import sys
+import functools
 import hashlib
+import threading
+from collections import defaultdict
 from pathlib import Path
 from datetime import datetime
 import argparse
+import importlib.util
 import subprocess
 
+REQUIREMENTS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../requirements.txt"))
+# Modules the scraper imports; --bootstrap installs requirements.txt if any are missing
+SCRAPER_MODULES = ("requests", "bs4", "lxml", "websocket", "selenium", "webdriver_manager")
+
+def ensure_dependencies():
+    """
+    Install requirements.txt with a single pip call if any module the scraper
+    needs is missing. Returns True if pip was run.
+    """
+    missing = [module for module in SCRAPER_MODULES if importlib.util.find_spec(module) is None]
+    if not missing:
+        return False
+    
+    print(f"Missing modules: {', '.join(missing)}")
+    print(f"Installing dependencies from {REQUIREMENTS_PATH}...")
+    subprocess.check_call([sys.executable, "-m", "pip", "install", "-r", REQUIREMENTS_PATH])
+    return True
+
+# --bootstrap has to run before the third-party imports below, which would
+# otherwise fail on a fresh environment before it got the chance
+if __name__ == "__main__" and "--bootstrap" in sys.argv[1:]:
+    try:
+        if ensure_dependencies():
+            print("Dependencies installed. Please run the script again.")
+            sys.exit(0)
+    except Exception as install_error:
+        print(f"Auto-installation failed: {install_error}")
+        print("Please install dependencies manually.")
+        sys.exit(1)
+
+try:
+    import requests
+    from bs4 import BeautifulSoup, SoupStrainer
+except ImportError as e:
+    if __name__ != "__main__":
+        raise
+    print(f"Missing module: {e.name if hasattr(e, 'name') else str(e)}.")
+    print("Please activate your virtual environment and install dependencies with:")
+    print(f"  pip install -r {REQUIREMENTS_PATH}")
+    print("or re-run with --bootstrap to install them automatically.")
+    sys.exit(1)
+
 # Try to import websocket-client (required for Selenium 4+)
 try:
     import websocket
@@ -35,6 +80,26 @@ except ImportError as e:
     print(f"Error importing Selenium related modules: {e}")
     print("Will attempt to import later with proper error handling.")
 
+# Prefer the C-based lxml parser; fall back to the pure-Python parser if it isn't installed
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    print("Warning: lxml not found, falling back to html.parser (slower).")
+    HTML_PARSER = "html.parser"
+
+# orjson serializes several times faster than the stdlib json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# xxhash is an optional, faster alternative to BLAKE2b for content fingerprints
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
 # Add project root to path to use the same config as process_civil_rules
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
 
@@ -100,6 +165,40 @@ BASE_URL = "https://www.justice.gov.uk/courts/procedure-rules/civil/rules"
 INPUT_DIR = CIVIL_RULES_DIR
 # Explicitly set the output directory for processed files
 PROCESSED_CIVIL_RULES_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../data/processed/civil_rules"))
+# Section delimiter inserted between headings during HTML extraction
+SECTION_MARKER = '\n\n---SECTION---\n\n'
+HEADING_TAGS = frozenset(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
+
+# Elements stripped from the page before extraction, each set matched in a single tree walk
+COOKIE_ELEMENT_SELECTOR = "div[class*=cookie i], div[class*=consent i]"
+PAGE_NOISE_SELECTOR = "script, style, nav, header, footer, " + COOKIE_ELEMENT_SELECTOR
+ARTICLE_NOISE_SELECTOR = (
+    "nav, header, footer, aside, "
+    "[class*=share-this i], [class*=breadcrumb i], [class*=navigation i], [class*=menu i]"
+)
+
+# Rule pages keep their content (and usually the "Updated" footer) inside <article>,
+# so the rest of the page needn't be built into the tree
+ARTICLE_ONLY = SoupStrainer('article')
+UPDATE_DATE_CLASS = "share-this bottom"
+
+# Number of rule pages scraped concurrently (each worker drives its own browser)
+SCRAPE_WORKERS = 5
+
+# Number of threads writing the individual rule files
+FILE_WRITE_WORKERS = 8
+
+# Elements that mark a page's main content as loaded
+CONTENT_READY_SELECTOR = "article, div.article, #main-content, main, figure.wp-block-table"
+
+# Plain HTTP fetches are used when the served HTML already holds the main content: pages
+# mentioning one of the markers are parsed and kept if the selector finds an element
+STATIC_CONTENT_MARKERS = ("<article", "wp-block-table")
+STATIC_CONTENT_SELECTOR = "article, figure.wp-block-table"
+HTTP_TIMEOUT = 10
+HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+}
 
 # File to track rule changes
 CHANGES_FILE = os.path.join(INPUT_DIR, "civil_rules_changes.json")
@@ -148,10 +247,65 @@ NAVIGATION_PATTERNS = [
     r"To the top$"
 ]
 
+# Navigation breadcrumbs and menu items stripped by clean_text
+CLEAN_TEXT_NAV_PATTERNS = [
+    r"^Home Courts Procedure rules Civil Rules & Practice Directions.*?Menu.*?(?=\([0-9]\.?\)|\w)",
+    r"^Home Courts Procedure rules Civil Rules & Practice Directions.*?Practice Directions.*?(?=\([0-9]\.?\)|\w)",
+    r"^Home Courts Procedure rules Civil Rules & Practice Directions.*?(?=\([0-9]\.?\)|\w)",
+    r"Menu\s*≡.*?(?=\([0-9]\.?\)|\w)",
+    r"Practice Directions Menu Practice Directions",
+    r"Home\s+Courts\s+Procedure rules\s+Civil.*?PRACTICE DIRECTION",
+    r"•\s+Home\s+•\s+•\s+Courts\s+•.*?•",  # Remove bullet navigation
+]
+
+# Cookie texts removed verbatim, without duplicates (plain substring search beats a regex
+# alternation of literals)
+COOKIE_TEXTS = tuple(dict.fromkeys([PROBLEMATIC_COOKIE_TEXT] + EXACT_COOKIE_TEXT))
+
+# Lowercase words every COOKIE_PATTERNS / CLEAN_TEXT_NAV_PATTERNS match contains;
+# clean_text only runs those regexes when one of them is present
+COOKIE_PATTERN_PROBES = ("cookie", "google analytic")
+NAV_PATTERN_PROBES = ("home", "menu")
+
+# Compiled once at import so the per-page cleaning doesn't go through the re cache
+COOKIE_REGEXES = [re.compile(p, re.IGNORECASE | re.DOTALL) for p in COOKIE_PATTERNS]
+CLEAN_TEXT_NAV_REGEXES = [re.compile(p, re.IGNORECASE | re.DOTALL) for p in CLEAN_TEXT_NAV_PATTERNS]
+START_JUNK_RE = re.compile(START_JUNK_PATTERN, re.IGNORECASE | re.DOTALL)
+END_JUNK_RE = re.compile(END_JUNK_PATTERN, re.IGNORECASE | re.DOTALL)
+SPECIFIC_JUNK_RE = re.compile(
+    r'\s*(?:' + '|'.join(re.escape(phrase) for phrase in SPECIFIC_JUNK_PHRASES) + r')\s*', re.IGNORECASE
+)
+SPECIFIC_JUNK_PHRASES_LOWER = tuple(phrase.lower() for phrase in SPECIFIC_JUNK_PHRASES)
+EXCESS_NEWLINES_RE = re.compile(r'\n{4,}')
+HORIZONTAL_SPACE_RE = re.compile(r'[ \t]{2,}|\t')  # single spaces are already collapsed
+CAMEL_CASE_RE = re.compile(r'([a-z])([A-Z])')
+DIGIT_LETTER_RE = re.compile(r'([0-9])([a-zA-Z])')
+LETTER_DIGIT_RE = re.compile(r'([a-zA-Z])([0-9])')
+UPDATED_DATE_RE = re.compile(r"Updated:\s*(.*)")
+
+# Rule title parsing
+PD_TOPIC_RE = re.compile(r'Practice Direction\s+\d+[A-Z]?\s*[-–]\s*(.+)', re.IGNORECASE)
+PART_TOPIC_RE = re.compile(r'Part\s+\d+\s*[-–]\s*(.+)', re.IGNORECASE)
+NOTES_ON_PREFIX_RE = re.compile(r'^Notes on\s+', re.IGNORECASE)
+PD_IDENTIFIER_RE = re.compile(r'(Practice Direction\s+\d+[A-Z]?)', re.IGNORECASE)
+PART_IDENTIFIER_RE = re.compile(r'(Part\s+\d+)', re.IGNORECASE)
+TITLE_DASH_RE = re.compile(r'\s*[-–]\s*')
+PD_SOURCEPAGE_RE = re.compile(r'Practice Direction\s+\d+[A-Z]?\s*[-–:]\s*(.+)', re.IGNORECASE)
+PART_SOURCEPAGE_RE = re.compile(r'Part\s+\d+\s*[-–:]\s*(.+)', re.IGNORECASE)
+SOURCEPAGE_SEPARATOR_RE = re.compile(r'\s*[-–:]\s*')
+
+# Filenames and title/content matching
+INVALID_FILENAME_CHARS_RE = re.compile(r'[<>:"/\\|?*\x00-\x1F]')
+TRAILING_SEGMENT_RE = re.compile(r'_[^_]*$')
+TITLE_STOPWORDS = frozenset({'practice', 'direction', 'part', 'notes', 'on', 'of', 'the', 'a', 'an', 'and', 'or'})
+
 def setup_selenium_driver():
     """Sets up the Selenium WebDriver."""
     options = webdriver.ChromeOptions()
     options.add_argument("--headless")  # Run browser in headless mode (no UI)
+    # Only the HTML is scraped, so don't download images
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
     driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
     return driver
 
@@ -165,20 +319,60 @@ def accept_cookies(driver):
     except Exception as e:
         print("Could not accept cookies or already accepted:", e)
 
+http_sessions = threading.local()
+
+def get_http_session():
+    """requests session for the calling thread, so each scrape worker reuses its own keep-alive connections."""
+    session = getattr(http_sessions, 'session', None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update(HTTP_HEADERS)
+        http_sessions.session = session
+    return session
+
+def fetch_static_page(url):
+    """Fetches a page over plain HTTP.
+
+    Returns (html, soup) with the page parsed by parse_rule_page, or None unless
+    the parsed page has its main content (a marker may also appear in a script).
+    """
+    try:
+        response = get_http_session().get(url, timeout=HTTP_TIMEOUT)
+    except requests.RequestException as e:
+        print(f"HTTP fetch failed for {url}: {e}")
+        return None
+    html_content = response.text
+    if not response.ok or not any(marker in html_content for marker in STATIC_CONTENT_MARKERS):
+        return None
+    soup = parse_rule_page(html_content)
+    if soup.select_one(STATIC_CONTENT_SELECTOR) is None:
+        return None
+    return html_content, soup
+
 def get_page_content(url, driver=None):
-    """Fetches the webpage content using Selenium or requests."""
+    """Fetches the webpage content, over plain HTTP where possible and Selenium otherwise.
+
+    ``driver`` may be a WebDriver or a zero-argument callable returning one, so a
+    browser is only started once a page turns out to need JavaScript.
+    Returns (html, soup); soup is the parse_rule_page tree of a plain HTTP fetch,
+    or None when the HTML came from elsewhere and still has to be parsed.
+    """
+    static_page = fetch_static_page(url)
+    if static_page is not None:
+        return static_page
+    
+    if callable(driver):
+        driver = driver()
+    
     if driver:
         # Using Selenium (for pages requiring JavaScript)
         print(f"Navigating to: {url}")
         driver.get(url)
         
-        # Wait a bit for page to fully load
-        time.sleep(2)
-        
         try:
-            # Wait until the page is fully loaded by checking for a known element
+            # Wait until the main content has rendered rather than sleeping a fixed time
             WebDriverWait(driver, 15).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
+                EC.presence_of_element_located((By.CSS_SELECTOR, CONTENT_READY_SELECTOR))
             )
         except TimeoutException:
             print(f"Timed out while waiting for page {url} to load.")
@@ -190,19 +384,20 @@ def get_page_content(url, driver=None):
         if current_url != url and not url.endswith(current_url.split('/')[-1]):
             print(f"WARNING: URL mismatch! Requested: {url}, Got: {current_url}")
         
-        return driver.page_source
+        return driver.page_source, None
     else:
-        # Using requests (for static pages)
-        response = requests.get(url)
-        return response.text
+        # No browser available - return whatever the server sent
+        response = get_http_session().get(url, timeout=HTTP_TIMEOUT)
+        return response.text, None
 
 def scrape_links(driver, base_url):
     """Scrapes all links from the CPR Rules page."""
     print(f"Scraping links from {base_url}")
     
     # Using the improved approach that successfully finds links in tables
-    page_content = get_page_content(base_url, driver)
-    soup = BeautifulSoup(page_content, "html.parser")
+    # Tables can sit outside the <article>, so the index page always gets a full parse
+    page_content, _ = get_page_content(base_url, driver)
+    soup = BeautifulSoup(page_content, HTML_PARSER)
 
     tables = soup.find_all("figure", {"class": "wp-block-table"})
     links = []
@@ -217,34 +412,35 @@ def scrape_links(driver, base_url):
     print(f"Found {len(links)} links.")
     return links
 
-def remove_cookies_from_html(html_content):
-    """Pre-process HTML to remove cookie consent elements before parsing."""
-    # Try to identify and remove cookie notice divs from the HTML
-    soup = BeautifulSoup(html_content, 'html.parser')
-    
-    # Remove cookie banner divs (these may have various IDs/classes)
-    for div in soup.find_all('div', class_=lambda c: c and ('cookie' in c.lower() or 'consent' in c.lower())):
-        div.decompose()
-    
-    # Remove any script elements that might be related to cookies - FIX DEPRECATION WARNING
-    for script in soup.find_all('script', string=lambda t: t and 'cookie' in t.lower()):
-        script.decompose()
-    
-    return str(soup)
+def parse_html(html_content, parse_only=None):
+    """Parse HTML into a BeautifulSoup tree, passing already-parsed soups through unchanged."""
+    if isinstance(html_content, BeautifulSoup):
+        return html_content
+    return BeautifulSoup(html_content, HTML_PARSER, parse_only=parse_only)
+
+def parse_rule_page(html_content):
+    """
+    Parse a rule page, only building the <article> subtree when it holds everything we read.
+    Falls back to a full parse when there is no article, or when the "Updated" footer
+    read by extract_update_date sits outside it.
+    """
+    if '<article' in html_content:
+        soup = parse_html(html_content, parse_only=ARTICLE_ONLY)
+        if soup.find('article') and (
+            UPDATE_DATE_CLASS not in html_content or soup.find("div", {"class": UPDATE_DATE_CLASS})
+        ):
+            return soup
+    return parse_html(html_content)
 
 def extract_content_chunks(html_content, rule_url=None):
-    """Extracts content from HTML and returns it as a single cleaned string with preserved structure."""
-    # Pre-process HTML to remove cookie elements
-    html_content = remove_cookies_from_html(html_content)
-    
-    soup = BeautifulSoup(html_content, 'html.parser')
-
-    # Remove cookie banners, scripts, nav, header, footer as before
-    for div in soup.find_all('div', class_=lambda c: c and ('cookie' in c.lower() or 'consent' in c.lower())):
-        div.decompose()
-    for script in soup.find_all('script', string=lambda t: t and 'cookie' in t.lower()):
-        script.decompose()
-    for element in soup.find_all(['script', 'style', 'nav', 'header', 'footer']):
+    """Extracts content from HTML and returns it as a single cleaned string with preserved structure.
+
+    Accepts either raw HTML or an already-parsed soup; a soup is modified in place.
+    """
+    soup = parse_html(html_content)
+
+    # Remove cookie banners, scripts (cookie-related or not), nav, header, footer in one pass
+    for element in soup.select(PAGE_NOISE_SELECTOR):
         element.decompose()
 
     # --- IMPROVED: Find the article container first ---
@@ -289,28 +485,25 @@ def extract_content_chunks(html_content, rule_url=None):
     else:
         print("Found div.article container")
     
-    # --- Remove unwanted elements ---
-    for unwanted in article_div.find_all(['nav', 'header', 'footer', 'aside']):
+    # --- Remove unwanted elements, share buttons and other navigation ---
+    for unwanted in article_div.select(ARTICLE_NOISE_SELECTOR):
         unwanted.decompose()
     
-    # Remove share buttons and other navigation
-    for element in article_div.find_all(class_=lambda c: c and any(
-        word in ' '.join(c).lower() for word in ['share-this', 'breadcrumb', 'navigation', 'menu']
-    )):
-        element.decompose()
-    
     # Remove anchor tags that are just bookmarks (empty or just contain name/id)
-    for a_tag in article_div.find_all('a'):
-        if not a_tag.get_text(strip=True) and (a_tag.get('name') or a_tag.get('id')):
+    # (only anchors carrying a name/id are visited, and their text is checked last)
+    for a_tag in article_div.select('a[name], a[id]'):
+        if (a_tag.get('name') or a_tag.get('id')) and not a_tag.get_text(strip=True):
             a_tag.decompose()
 
     # --- Extract content with HTML structure-based sectioning ---
     content_sections = []
+    last_was_section_marker = False
     
     # Add title as first section if present
     if page_title:
         content_sections.append(page_title)
-        content_sections.append('\n\n---SECTION---\n\n')
+        content_sections.append(SECTION_MARKER)
+        last_was_section_marker = True
     
     # Process all paragraphs and headings in order
     for element in article_div.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'ul', 'ol', 'blockquote', 'div']):
@@ -319,31 +512,33 @@ def extract_content_chunks(html_content, rule_url=None):
         if not text or len(text) < 3:
             continue
         
-        # Skip if element only contains anchor names/ids (bookmarks)
-        if element.name == 'p':
-            # Check if paragraph only contains empty anchor tags
+        # Skip very short paragraphs that only contain anchor names/ids (bookmarks);
+        # the length check comes first so longer paragraphs never walk their anchors
+        if element.name == 'p' and len(text) < 10:
             anchors = element.find_all('a')
             if anchors and all(not a.get_text(strip=True) for a in anchors):
-                if len(text) < 10:  # Very short text with just anchors
-                    continue
+                continue
         
         # Skip elements that are likely navigation or metadata
-        if element.get('class'):
-            classes = ' '.join(element.get('class', [])).lower()
+        element_classes = element.get('class')
+        if element_classes:
+            classes = ' '.join(element_classes).lower()
             if any(skip in classes for skip in ['nav', 'menu', 'breadcrumb', 'meta', 'share']):
                 continue
         
         # Handle different element types
-        if element.name in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
+        if element.name in HEADING_TAGS:
             # Headings start new sections
-            if content_sections and not content_sections[-1].endswith('---SECTION---\n\n'):
-                content_sections.append('\n\n---SECTION---\n\n')
+            if content_sections and not last_was_section_marker:
+                content_sections.append(SECTION_MARKER)
             content_sections.append(text)
             content_sections.append('\n\n')
+            last_was_section_marker = False
         elif element.name == 'p':
             # Paragraphs are the main content - each paragraph is naturally a section
             content_sections.append(text)
             content_sections.append('\n\n')
+            last_was_section_marker = False
         elif element.name in ['ul', 'ol']:
             # Process list items
             list_items = []
@@ -354,15 +549,18 @@ def extract_content_chunks(html_content, rule_url=None):
             if list_items:
                 content_sections.append('\n'.join(list_items))
                 content_sections.append('\n\n')
+                last_was_section_marker = False
         elif element.name == 'blockquote':
             content_sections.append(f"> {text}")
             content_sections.append('\n\n')
+            last_was_section_marker = False
         elif element.name == 'div':
             # Only process divs that don't contain other block elements
             if not element.find(['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'ul', 'ol', 'blockquote']):
                 if len(text) > 20:  # Only substantial text
                     content_sections.append(text)
                     content_sections.append('\n\n')
+                    last_was_section_marker = False
     
     # Join all content
     text = ''.join(content_sections)
@@ -407,50 +605,44 @@ def clean_text(text):
     text = text.replace('\u00a0', ' ')  # Non-breaking space
 
     # 2. Remove cookie text first (before header/footer removal)
-    if PROBLEMATIC_COOKIE_TEXT in text:
-        text = text.replace(PROBLEMATIC_COOKIE_TEXT, "")
-    for cookie_text in EXACT_COOKIE_TEXT:
+    for cookie_text in COOKIE_TEXTS:
         text = text.replace(cookie_text, "")
-    for pattern in COOKIE_PATTERNS:
-        text = re.sub(pattern, "", text, flags=re.IGNORECASE | re.DOTALL)
+    # Most pages are clean: skip the regex scans when none of their key words appear
+    lowered = text.lower()
+    if any(probe in lowered for probe in COOKIE_PATTERN_PROBES):
+        for regex in COOKIE_REGEXES:
+            text = regex.sub("", text)
+        lowered = text.lower()
     
     # 3. Remove navigation breadcrumbs and menu items
-    nav_patterns = [
-        r"^Home Courts Procedure rules Civil Rules & Practice Directions.*?Menu.*?(?=\([0-9]\.?\)|\w)",
-        r"^Home Courts Procedure rules Civil Rules & Practice Directions.*?Practice Directions.*?(?=\([0-9]\.?\)|\w)",
-        r"^Home Courts Procedure rules Civil Rules & Practice Directions.*?(?=\([0-9]\.?\)|\w)",
-        r"Menu\s*≡.*?(?=\([0-9]\.?\)|\w)",
-        r"Practice Directions Menu Practice Directions",
-        r"Home\s+Courts\s+Procedure rules\s+Civil.*?PRACTICE DIRECTION",
-        r"•\s+Home\s+•\s+•\s+Courts\s+•.*?•",  # Remove bullet navigation
-    ]
-    
-    for pattern in nav_patterns:
-        text = re.sub(pattern, "", text, flags=re.IGNORECASE | re.DOTALL).strip()
+    if any(probe in lowered for probe in NAV_PATTERN_PROBES):
+        for regex in CLEAN_TEXT_NAV_REGEXES:
+            text = regex.sub("", text).strip()
+    else:
+        text = text.strip()
     
     # 4. Don't collapse newlines - preserve them!
     # Just normalize excessive newlines
-    text = re.sub(r'\n{4,}', '\n\n\n', text)  # Max 3 newlines
+    if '\n\n\n\n' in text:
+        text = EXCESS_NEWLINES_RE.sub('\n\n\n', text)  # Max 3 newlines
     
     # 5. Remove start/end junk and specific phrases
-    text = re.sub(START_JUNK_PATTERN, "", text, flags=re.IGNORECASE | re.DOTALL).strip()
-    text = re.sub(END_JUNK_PATTERN, "", text, flags=re.IGNORECASE | re.DOTALL).strip()
-    for phrase in SPECIFIC_JUNK_PHRASES:
-        text = re.sub(r'\s*' + re.escape(phrase) + r'\s*', ' ', text, flags=re.IGNORECASE).strip()
-
-    # 6. Clean up spaces on each line (but preserve line structure)
-    lines = text.split('\n')
-    cleaned_lines = []
-    for line in lines:
-        # Clean spaces within the line
-        line = re.sub(r'[ \t]+', ' ', line).strip()
-        cleaned_lines.append(line)
-    text = '\n'.join(cleaned_lines)
+    text = START_JUNK_RE.sub("", text).strip()
+    text = END_JUNK_RE.sub("", text).strip()
+    # The leading \s* makes this regex try every position, so only run it when a phrase is there
+    lowered = text.lower()
+    if any(phrase in lowered for phrase in SPECIFIC_JUNK_PHRASES_LOWER):
+        text = SPECIFIC_JUNK_RE.sub(' ', text).strip()
+
+    # 6. Clean up spaces on each line (but preserve line structure):
+    # collapse runs of spaces/tabs over the whole text at once, then trim each line
+    text = HORIZONTAL_SPACE_RE.sub(' ', text)
+    text = '\n'.join(map(str.strip, text.split('\n')))
 
     # 7. Split camelCase or joined tokens
-    text = re.sub(r'([a-z])([A-Z])', r'\1 \2', text)
-    text = re.sub(r'([0-9])([a-zA-Z])', r'\1 \2', text)
-    text = re.sub(r'([a-zA-Z])([0-9])', r'\1 \2', text)
+    text = CAMEL_CASE_RE.sub(r'\1 \2', text)
+    text = DIGIT_LETTER_RE.sub(r'\1 \2', text)
+    text = LETTER_DIGIT_RE.sub(r'\1 \2', text)
 
     # 8. Remove any leading dots or spaces
     text = text.lstrip('. ')
@@ -462,64 +654,6 @@ def clean_text(text):
 
     return text
 
-def is_cookie_notice(text):
-    """Check if the text is entirely a cookie notice."""
-    # Check for the most problematic text first
-    if PROBLEMATIC_COOKIE_TEXT in text:
-        return True
-    
-    # First check exact matches
-    for cookie_text in EXACT_COOKIE_TEXT:
-        if cookie_text in text:
-            return True
-    
-    # Then use regex patterns
-    for pattern in COOKIE_PATTERNS:
-        if re.search(pattern, text, flags=re.IGNORECASE | re.DOTALL):
-            return True
-    
-    # Look for key cookie phrases
-    cookie_keywords = [
-        "we use cookies",
-        "cookie settings",
-        "cookies on www.justice.gov.uk",
-        "which cookies are you happy",
-        "google analytics",
-        "Some are essential to make the site work",
-        "You can choose to turn off the non-essential cookies"
-    ]
-    
-    for keyword in cookie_keywords:
-        if keyword.lower() in text.lower():
-            return True
-            
-    return False
-
-def remove_remaining_cookie_text(chunks):
-    """Last-resort method to forcibly remove any remaining cookie notices."""
-    clean_chunks = []
-    
-    for chunk in chunks:
-        # Skip the chunk entirely if it's very similar to a cookie notice
-        if len(chunk) < 300 and any(cookie_text in chunk for cookie_text in EXACT_COOKIE_TEXT):
-            continue
-        
-        # For longer chunks that might have cookie text embedded, use prefix removal
-        if chunk.startswith("We use small files called 'cookies'"):
-            # Find the first period after "non-essential cookies."
-            cookie_end = chunk.find(".", chunk.find("non-essential cookies")) + 1
-            if cookie_end > 0:
-                clean_chunk = chunk[cookie_end:].strip()
-                if clean_chunk:  # Only add if there's content left
-                    clean_chunks.append(clean_chunk)
-                continue
-        
-        # Only add chunks that don't have cookie text
-        if not is_cookie_notice(chunk):
-            clean_chunks.append(chunk)
-    
-    return clean_chunks
-
 def is_spaced_noise(text):
     """Detect noise where single letters are space‑separated (e.g. 'H o m e C o u r t s ...')."""
     tokens = text.split()
@@ -529,15 +663,15 @@ def is_spaced_noise(text):
     return False
 
 def extract_update_date(html_content):
-    """Attempt to extract the last update date from the page."""
-    soup = BeautifulSoup(html_content, 'html.parser')
+    """Attempt to extract the last update date from the page (raw HTML or a parsed soup)."""
+    soup = parse_html(html_content)
     
     # Look for the update div first
-    updated_info = soup.find("div", {"class": "share-this bottom"})
+    updated_info = soup.find("div", {"class": UPDATE_DATE_CLASS})
     updated_text = updated_info.get_text(" ", strip=True) if updated_info else ""
     
     # Extract date using pattern matching
-    match = re.search(r"Updated:\s*(.*)", updated_text)
+    match = UPDATED_DATE_RE.search(updated_text)
     if match:
         date_str = match.group(1).strip()
         try:
@@ -558,12 +692,12 @@ def extract_topic_name(rule_title):
     # Remove "Practice Direction" or "Part" prefix and numbers to get topic
     
     # For Practice Directions, extract the topic after the identifier
-    pd_match = re.search(r'Practice Direction\s+\d+[A-Z]?\s*[-–]\s*(.+)', rule_title, re.IGNORECASE)
+    pd_match = PD_TOPIC_RE.search(rule_title)
     if pd_match:
         return pd_match.group(1).strip()
     
     # For Parts, extract the topic after the identifier  
-    part_match = re.search(r'Part\s+\d+\s*[-–]\s*(.+)', rule_title, re.IGNORECASE)
+    part_match = PART_TOPIC_RE.search(rule_title)
     if part_match:
         return part_match.group(1).strip()
     
@@ -572,7 +706,7 @@ def extract_topic_name(rule_title):
     topic = rule_title
     
     # Remove "Notes on" prefix if present
-    topic = re.sub(r'^Notes on\s+', '', topic, flags=re.IGNORECASE)
+    topic = NOTES_ON_PREFIX_RE.sub('', topic)
     
     # If no clear pattern, return the title as-is
     return topic.strip()
@@ -582,14 +716,14 @@ def extract_rule_identifier(rule_title):
     Extracts just the rule identifier (e.g., 'Practice Direction 2A', 'Part 14') from the full rule title.
     """
     # Match "Practice Direction X" (with optional letter) or "Part X"
-    pd_match = re.match(r'(Practice Direction\s+\d+[A-Z]?)', rule_title, re.IGNORECASE)
+    pd_match = PD_IDENTIFIER_RE.match(rule_title)
     if pd_match:
         return pd_match.group(1).strip()
-    part_match = re.match(r'(Part\s+\d+)', rule_title, re.IGNORECASE)
+    part_match = PART_IDENTIFIER_RE.match(rule_title)
     if part_match:
         return part_match.group(1).strip()
     # Fallback: return the first part before a dash or en dash
-    dash_split = re.split(r'\s*[-–]\s*', rule_title)
+    dash_split = TITLE_DASH_RE.split(rule_title)
     if dash_split:
         return dash_split[0].strip()
     return rule_title.strip()
@@ -601,15 +735,15 @@ def extract_sourcepage_topic(rule_title):
     -> "participation of vulnerable parties or witnesses"
     """
     # For Practice Directions, extract after the identifier and dash
-    pd_match = re.match(r'Practice Direction\s+\d+[A-Z]?\s*[-–:]\s*(.+)', rule_title, re.IGNORECASE)
+    pd_match = PD_SOURCEPAGE_RE.match(rule_title)
     if pd_match:
         return pd_match.group(1).strip()
     # For Parts, extract after the identifier and dash
-    part_match = re.match(r'Part\s+\d+\s*[-–:]\s*(.+)', rule_title, re.IGNORECASE)
+    part_match = PART_SOURCEPAGE_RE.match(rule_title)
     if part_match:
         return part_match.group(1).strip()
     # If no match, fallback to previous logic (but avoid identifier)
-    dash_split = re.split(r'\s*[-–:]\s*', rule_title, maxsplit=1)
+    dash_split = SOURCEPAGE_SEPARATOR_RE.split(rule_title, maxsplit=1)
     if len(dash_split) == 2:
         return dash_split[1].strip()
     return rule_title.strip()
@@ -721,15 +855,20 @@ def format_content_for_review(content):
 def create_safe_filename(text, max_length=100):
     """Create a safe filename from text, handling length limits and invalid characters."""
     # Remove any invalid characters for filenames
-    safe_text = re.sub(r'[<>:"/\\|?*\x00-\x1F]', '_', text)
+    safe_text = INVALID_FILENAME_CHARS_RE.sub('_', text)
     
     # Truncate to max_length if necessary, ensuring not to cut off words
     if len(safe_text) > max_length:
-        safe_text = re.sub(r'_[^_]*$', '', safe_text[:max_length])  # Remove last segment after underscore
+        safe_text = TRAILING_SEGMENT_RE.sub('', safe_text[:max_length])  # Remove last segment after underscore
         safe_text = safe_text.rstrip('_')  # Remove trailing underscore if any
     
     return safe_text
 
+@functools.lru_cache(maxsize=None)
+def get_chunker(max_tokens, overlap_tokens):
+    """Returns a shared chunker per limit pair, so the tokenizer is only loaded once."""
+    return LegalDocumentChunker(max_tokens=max_tokens, overlap_tokens=overlap_tokens)
+
 def create_azure_search_documents_from_rule(rule_title, rule_url, rule_id, last_updated, content):
     """
     Create document(s) in Azure Search OpenAI demo format from rule content.
@@ -746,7 +885,7 @@ def create_azure_search_documents_from_rule(rule_title, rule_url, rule_id, last_
         List of documents in Azure Search OpenAI demo format
     """
     # Initialize chunker with text-embedding-3-large limits (8191 tokens with safety margin)
-    chunker = LegalDocumentChunker(max_tokens=7500, overlap_tokens=200)
+    chunker = get_chunker(7500, 200)
     
     # Use only the topic/title for sourcepage
     sourcepage = extract_sourcepage_topic(rule_title)
@@ -756,14 +895,20 @@ def create_azure_search_documents_from_rule(rule_title, rule_url, rule_id, last_
     # Detect sections and create both flattened and sectioned content
     flattened_content, sectioned_content = detect_and_preserve_sections(content)
     
-    # Check if content needs chunking using flattened content
-    token_count = chunker.count_tokens(flattened_content)
+    # Check if content needs chunking using flattened content. Every token covers at
+    # least one UTF-8 byte, so content no longer than max_tokens bytes is known to fit
+    # and skips the tokenizer pass
+    if len(flattened_content.encode('utf-8')) <= chunker.max_tokens:
+        needs_chunking = False
+    else:
+        needs_chunking = chunker.count_tokens(flattened_content) > chunker.max_tokens
     
     # Always chunk if token_count > max_tokens, otherwise single doc
-    if token_count > chunker.max_tokens:
+    if needs_chunking:
         # Content exceeds limits - chunk it using flattened content
-        # For chunking, temporarily remove section delimiters to get clean text
-        clean_content_for_chunking = flattened_content.replace('\n\n---\n\n', ' ')
+        # For chunking, join the (already stripped) sections with spaces rather than
+        # searching the flattened text for the delimiters it was joined with
+        clean_content_for_chunking = ' '.join(sectioned_content)
         chunks = chunker.chunk_legal_document(clean_content_for_chunking, rule_id, rule_title)
         
         documents = []
@@ -818,8 +963,18 @@ def create_azure_search_documents_from_rule(rule_title, rule_url, rule_id, last_
         
         return [document]
 
+def content_fingerprint(text):
+    """64-bit fingerprint of page content (16 hex chars), used to spot changed or repeated pages."""
+    content_bytes = text.encode('utf-8')
+    if xxhash is not None:
+        return xxhash.xxh3_64_hexdigest(content_bytes)
+    return hashlib.blake2b(content_bytes, digest_size=8).hexdigest()
+
 def scrape_rule_content(link, driver=None):
-    """Scrapes the content of a specific rule page and returns document(s)."""
+    """Scrapes the content of a specific rule page.
+
+    Returns a (documents, content_hash) tuple; content_hash is None when nothing was extracted.
+    """
     rule_title = link['title']
     rule_url = link['url']
     rule_id = create_safe_filename(rule_title)
@@ -830,10 +985,10 @@ def scrape_rule_content(link, driver=None):
     print(f"Expected unique content for: {rule_title}")
     
     # Fetch page content with better debugging
-    html_content = get_page_content(rule_url, driver)
+    html_content, soup = get_page_content(rule_url, driver)
     if not html_content:
         print(f"Failed to retrieve content for {rule_url}")
-        return []
+        return [], None
     
     # Check for common content patterns that suggest wrong page
     if "PRACTICE DIRECTION 1 A - PARTICIPATION OF VULNERABLE PARTIES" in html_content:
@@ -841,23 +996,26 @@ def scrape_rule_content(link, driver=None):
             print(f"WARNING: Found Practice Direction 1A content on page that should be '{rule_title}'")
             print("This suggests URL redirection or incorrect page loading")
     
+    # Parse once and share the tree; the date is read before content extraction prunes it
+    if soup is None:
+        soup = parse_rule_page(html_content)
+    
     # Extract update date
-    last_updated = extract_update_date(html_content)
+    last_updated = extract_update_date(soup)
     
     # Extract main content
-    content = extract_content_chunks(html_content, rule_url)
+    content = extract_content_chunks(soup, rule_url)
     
     if len(content) < 50:
         print(f"Skipped {rule_title}: content too short after extraction")
-        return []
+        return [], None
     
     # Check if content matches expected rule
     content_lower = content.lower()
     title_words = rule_title.lower().replace('–', ' ').replace(':', '').split()
     
     # Remove common words
-    significant_words = [word for word in title_words if word not in 
-                        ['practice', 'direction', 'part', 'notes', 'on', 'of', 'the', 'a', 'an', 'and', 'or']]
+    significant_words = [word for word in title_words if word not in TITLE_STOPWORDS]
     
     if significant_words:
         matches = sum(1 for word in significant_words if word in content_lower)
@@ -871,7 +1029,7 @@ def scrape_rule_content(link, driver=None):
             print(f"WARNING: Low content match for '{rule_title}' - may be wrong content")
     
     # Show content preview with hash for uniqueness tracking
-    content_hash = hashlib.md5(content.encode()).hexdigest()[:12]
+    content_hash = content_fingerprint(content)
     preview = content[:300].replace('\n', '\\n')
     print(f"Content hash: {content_hash}")
     print(f"Content preview (300 chars): {preview}...")
@@ -882,43 +1040,122 @@ def scrape_rule_content(link, driver=None):
     print(f"Created {len(documents)} document(s) for {rule_title}")
     print(f"Content length: {len(content)} characters")
     
-    return documents
+    return documents, content_hash
+
+class RuleOutputBuffer:
+    """
+    Stands in for sys.stdout while rules are scraped concurrently. Output printed
+    inside capture() is held per thread and written in one piece when the rule
+    finishes, so each rule's progress lines stay together; other output passes through.
+    """
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+        self.lock = threading.Lock()
+    
+    def write(self, text):
+        buffer = getattr(self.local, 'buffer', None)
+        if buffer is None:
+            with self.lock:
+                return self.stream.write(text)
+        return buffer.write(text)
+    
+    def flush(self):
+        if getattr(self.local, 'buffer', None) is None:
+            self.stream.flush()
+    
+    @contextlib.contextmanager
+    def capture(self):
+        self.local.buffer = io.StringIO()
+        try:
+            yield
+        finally:
+            text = self.local.buffer.getvalue()
+            self.local.buffer = None
+            with self.lock:
+                self.stream.write(text)
+                self.stream.flush()
+    
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+def create_driver():
+    """Sets up a Selenium driver with the cookie banner already accepted."""
+    driver = setup_selenium_driver()
+    driver.get(BASE_URL)
+    accept_cookies(driver)
+    return driver
+
+def scrape_all_rules(links, driver=None, max_workers=SCRAPE_WORKERS):
+    """Scrapes content from all rule pages and returns list of documents.
 
-def scrape_all_rules(links, driver=None):
-    """Scrapes content from all rule pages and returns list of documents."""
+    Pages are scraped by up to max_workers threads. ``driver`` may be a WebDriver,
+    a callable returning one, or None (see get_page_content). A WebDriver must not
+    be shared between threads, so with several workers each one lazily creates its
+    own browser the first time a page needs it; with a single worker the given
+    driver is reused. Documents are returned in link order.
+    """
     all_documents = []
     content_hashes = {}  # Track content hashes to detect duplicates
+    max_workers = max(1, min(max_workers, len(links)))
+    
+    worker_drivers = []
+    drivers_lock = threading.Lock()
+    local = threading.local()
+    
+    def get_worker_driver():
+        worker_driver = getattr(local, 'driver', None)
+        if worker_driver is None:
+            worker_driver = create_driver()
+            local.driver = worker_driver
+            with drivers_lock:
+                worker_drivers.append(worker_driver)
+        return worker_driver
+    
+    page_driver = driver if driver is None or max_workers == 1 else get_worker_driver
+    # With several workers, hold each rule's output until it finishes so rules don't interleave
+    output = RuleOutputBuffer(sys.stdout) if max_workers > 1 else None
+    
+    def scrape_one(item):
+        i, link = item
+        with output.capture() if output is not None else contextlib.nullcontext():
+            print(f"\n[{i}/{len(links)}] Processing: {link['title']}")
+            try:
+                return scrape_rule_content(link, page_driver)
+            except Exception as e:
+                print(f"❌ Error processing {link['title']}: {e}")
+                import traceback
+                traceback.print_exc(file=sys.stdout)
+                return None, None
     
-    # Don't use threading for now to better debug the issue
-    print("Processing rules sequentially for better debugging...")
+    print(f"Processing rules with {max_workers} worker(s)...")
     
-    for i, link in enumerate(links, 1):
-        print(f"\n[{i}/{len(links)}] Processing: {link['title']}")
-        
-        try:
-            documents = scrape_rule_content(link, driver)
-            
-            if documents:
-                # Check for duplicate content
-                main_doc = documents[0]
-                content_hash = hashlib.md5(main_doc['content'].encode()).hexdigest()[:12]
+    if output is not None:
+        sys.stdout = output
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for link, (documents, content_hash) in zip(links, executor.map(scrape_one, enumerate(links, 1))):
+                if documents is None:
+                    continue
                 
-                if content_hash in content_hashes:
-                    print(f"⚠️  DUPLICATE CONTENT DETECTED!")
-                    print(f"   Same content as: {content_hashes[content_hash]}")
-                    print(f"   Current document: {link['title']}")
+                if documents:
+                    # Check for duplicate content, reusing the fingerprint taken while scraping
+                    if content_hash in content_hashes:
+                        print(f"⚠️  DUPLICATE CONTENT DETECTED!")
+                        print(f"   Same content as: {content_hashes[content_hash]}")
+                        print(f"   Current document: {link['title']}")
+                    else:
+                        content_hashes[content_hash] = link['title']
+                        print(f"✅ Unique content confirmed for: {link['title']}")
+                    
+                    all_documents.extend(documents)
                 else:
-                    content_hashes[content_hash] = link['title']
-                    print(f"✅ Unique content confirmed for: {link['title']}")
-                
-                all_documents.extend(documents)
-            else:
-                print(f"❌ No documents extracted from {link['title']}")
-                
-        except Exception as e:
-            print(f"❌ Error processing {link['title']}: {e}")
-            import traceback
-            traceback.print_exc()
+                    print(f"❌ No documents extracted from {link['title']}")
+    finally:
+        if output is not None:
+            sys.stdout = output.stream
+        for worker_driver in worker_drivers:
+            worker_driver.quit()
     
     print(f"\nContent uniqueness summary:")
     print(f"Total unique content hashes: {len(content_hashes)}")
@@ -929,6 +1166,24 @@ def scrape_all_rules(links, driver=None):
     
     return all_documents
 
+def write_json_file(path, data):
+    """Write data as indented UTF-8 JSON, using orjson when available."""
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+def write_jsonl_file(path, documents):
+    """Write documents as newline-delimited JSON, one compact UTF-8 document per line."""
+    with open(path, 'wb') as f:
+        for doc in documents:
+            if orjson is not None:
+                f.write(orjson.dumps(doc, option=orjson.OPT_APPEND_NEWLINE))
+            else:
+                f.write(json.dumps(doc, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n')
+
 def create_individual_files_from_documents(all_documents, output_dir=None):
     """Create individual JSON files for each parent document, grouping chunks together."""
     output_dir = output_dir or PROCESSED_CIVIL_RULES_DIR
@@ -936,13 +1191,14 @@ def create_individual_files_from_documents(all_documents, output_dir=None):
     files_created = 0
 
     # Group documents by parent_id
-    parent_groups = {}
+    parent_groups = defaultdict(list)
     for document in all_documents:
         parent_id = document.get('parent_id', document.get('id'))
-        if parent_id not in parent_groups:
-            parent_groups[parent_id] = []
         parent_groups[parent_id].append(document)
 
+    # Build every file first, then write them concurrently since each write is independent I/O
+    files_to_write = []
+
     for parent_id, documents in parent_groups.items():
         documents.sort(key=lambda x: x.get('id', ''))
         main_doc = next((doc for doc in documents if doc['id'] == parent_id), documents[0])
@@ -967,44 +1223,51 @@ def create_individual_files_from_documents(all_documents, output_dir=None):
 
         safe_filename = create_safe_filename(main_doc.get('sourcefile', main_doc.get('id', 'unknown')))
         file_path = os.path.join(output_dir, f"{safe_filename}.json")
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(individual_doc, f, indent=2, ensure_ascii=False)
+        files_to_write.append((file_path, individual_doc, len(documents)))
+
+    # Rules sharing a filename overwrite each other in order, so only the last one is written
+    latest_by_path = {file_path: individual_doc for file_path, individual_doc, _ in files_to_write}
+    if latest_by_path:
+        max_workers = min(FILE_WRITE_WORKERS, len(latest_by_path))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # list() surfaces any write error here rather than dropping it
+            list(executor.map(lambda item: write_json_file(*item), latest_by_path.items()))
+
+    for file_path, _, chunk_count in files_to_write:
         files_created += 1
-        chunk_info = f" ({len(documents)} chunks)" if len(documents) > 1 else ""
+        chunk_info = f" ({chunk_count} chunks)" if chunk_count > 1 else ""
         print(f"Created: {file_path}{chunk_info}")
     return files_created
 
-def create_flattened_output_file(all_documents, output_dir=None):
-    """Create a single flattened JSON file with all documents."""
+def create_flattened_output_file(all_documents, output_dir=None, jsonl=False):
+    """Create a single flattened JSON file with all documents (a JSONL file if jsonl is set)."""
     output_dir = output_dir or PROCESSED_CIVIL_RULES_DIR
     os.makedirs(output_dir, exist_ok=True)
 
-    embedding_documents = []
-    for doc in all_documents:
-        embedding_doc = doc.copy()
-        embedding_doc.pop('_sectioned_content', None)
-        embedding_documents.append(embedding_doc)
-
-    flattened_output_path = os.path.join(output_dir, "civil_procedure_rules_flattened.json")
-    with open(flattened_output_path, 'w', encoding='utf-8') as f:
-        json.dump(embedding_documents, f, indent=2, ensure_ascii=False)
-
-    # Review version: keep content as a single string with line breaks
-    review_documents = []
-    for doc in all_documents:
-        review_doc = doc.copy()
-        # format into array of sections with preserved line breaks
-        if '_sectioned_content' in doc and doc['_sectioned_content']:
-            review_doc['content'] = format_content_for_review(doc['_sectioned_content'])
+    # Detach the internal sectioned content so the documents can be written as-is
+    # instead of copied; it is put back (as the last key, where it started) afterwards
+    sectioned_contents = [doc.pop('_sectioned_content', None) for doc in all_documents]
+    try:
+        if jsonl:
+            flattened_output_path = os.path.join(output_dir, "civil_procedure_rules_flattened.jsonl")
+            write_jsonl_file(flattened_output_path, all_documents)
         else:
+            flattened_output_path = os.path.join(output_dir, "civil_procedure_rules_flattened.json")
+            write_json_file(flattened_output_path, all_documents)
+
+        # Review version: only the content differs, so each document gets a single new dict
+        review_documents = []
+        for doc, sectioned_content in zip(all_documents, sectioned_contents):
+            # format into array of sections with preserved line breaks;
             # if no sectioned content, split the flattened content
-            review_doc['content'] = format_content_for_review(doc.get('content', ''))
-        review_doc.pop('_sectioned_content', None)
-        review_documents.append(review_doc)
+            review_content = format_content_for_review(sectioned_content or doc.get('content', ''))
+            review_documents.append({**doc, 'content': review_content})
 
-    review_output_path = os.path.join(output_dir, "civil_procedure_rules_review.json")
-    with open(review_output_path, 'w', encoding='utf-8') as f:
-        json.dump(review_documents, f, indent=2, ensure_ascii=False)
+        review_output_path = os.path.join(output_dir, "civil_procedure_rules_review.json")
+        write_json_file(review_output_path, review_documents)
+    finally:
+        for doc, sectioned_content in zip(all_documents, sectioned_contents):
+            doc['_sectioned_content'] = sectioned_content
 
     # Calculate statistics
     chunked_docs = [doc for doc in all_documents if doc['id'] != doc['parent_id']]
@@ -1059,21 +1322,33 @@ def main():
     parser.add_argument("--test-url", help="URL of single rule page to scrape for testing")
     parser.add_argument("--test-single", action="store_true", help="Test by processing only the first rule found")
     parser.add_argument("--test-few", type=int, help="Test by processing first N rules")
+    parser.add_argument("--workers", type=int, default=SCRAPE_WORKERS,
+                        help=f"Number of rule pages to scrape concurrently (default: {SCRAPE_WORKERS})")
+    parser.add_argument("--sequential", action="store_true",
+                        help="Scrape rule pages one at a time with a single browser (easier to debug)")
+    parser.add_argument("--jsonl", action="store_true",
+                        help="Write the flattened documents as JSONL (one document per line) instead of a JSON array")
+    parser.add_argument("--bootstrap", action="store_true",
+                        help="Install requirements.txt first if any scraper dependency is missing")
     args = parser.parse_args()
     print(f"DEBUG: parsed args = {args}")
 
-    driver = setup_selenium_driver()
+    # The browser is only started if a page can't be fetched as static HTML
+    driver = None
+    
+    def get_driver():
+        nonlocal driver
+        if driver is None:
+            driver = create_driver()
+        return driver
+    
     try:
-        # Accept cookies
-        driver.get(BASE_URL)
-        accept_cookies(driver)
-        
         # Scrape links
         if args.test_url:
             print(f"Test mode: scraping only {args.test_url}")
             links = [{"title": "Test URL", "url": args.test_url}]
         else:
-            links = scrape_links(driver, BASE_URL)
+            links = scrape_links(get_driver, BASE_URL)
             
             # If test_single flag is set, only process the first rule
             if args.test_single and links:
@@ -1090,7 +1365,8 @@ def main():
             print(f"Processing {len(links)} rule(s)...")
             
             # Scrape content from each link - now returns list of documents (potentially chunked)
-            all_documents = scrape_all_rules(links, driver)
+            max_workers = 1 if args.sequential else args.workers
+            all_documents = scrape_all_rules(links, get_driver, max_workers=max_workers)
             
             if all_documents:
                 print(f"Total documents extracted: {len(all_documents)}")
@@ -1110,7 +1386,7 @@ def main():
                 files_created = create_individual_files_from_documents(all_documents)
                 
                 # Create flattened output file
-                flattened_output_path = create_flattened_output_file(all_documents)
+                flattened_output_path = create_flattened_output_file(all_documents, jsonl=args.jsonl)
                 
                 # Create summary with chunking information
                 summary_path = os.path.join(PROCESSED_DIR, "civil_rules_summary.json")
@@ -1162,62 +1438,12 @@ def main():
             driver.quit()
             print("Browser driver closed.")
 
-def install_missing_packages():
-    """Install any missing packages required for the scraper to run."""
-    required_packages = [
-        "websocket-client",
-        "requests",
-        "beautifulsoup4",
-        "selenium",
-        "webdriver-manager"
-    ]
-    
-    # Install each package using pip
-    for package in required_packages:
-        try:
-            print(f"Installing package: {package}...")
-            subprocess.check_call([sys.executable, "-m", "pip", "install", package])
-            print(f"Successfully installed {package}")
-        except Exception as e:
-            print(f"Failed to install {package}: {e}")
-            print("Please install it manually using: pip install " + package)
-
 # --- MAIN SCRIPT EXECUTION ---
 if __name__ == "__main__":
     try:
-        import requests
-        from bs4 import BeautifulSoup
-        try:
-            # Try traditional import
-            import websocket
-        except ImportError:
-            try:
-                # Try alternate approach for importing websocket
-                from websocket import WebSocketApp
-                print("Found WebSocketApp through direct import.")
-            except ImportError:
-                print("Installing websocket-client package...")
-                subprocess.check_call([sys.executable, "-m", "pip", "install", "websocket-client"])
-                import websocket
-                print("Successfully installed and imported websocket")
-        
-        # Try to import selenium
-        try:
-            from selenium import webdriver
-            from webdriver_manager.chrome import ChromeDriverManager
-        except ImportError:
-            print("Selenium not found. Installing selenium and webdriver-manager...")
-            import subprocess
-            try:
-                subprocess.check_call([sys.executable, "-m", "pip", "install", "selenium", "webdriver-manager"])
-                print("Successfully installed selenium and webdriver-manager")
-                from selenium import webdriver
-                from webdriver_manager.chrome import ChromeDriverManager
-            except Exception as e:
-                print(f"Failed to install selenium: {e}")
-                print("Please install manually:")
-                print("  pip install selenium webdriver-manager")
-                sys.exit(1)
+        import websocket
+        from selenium import webdriver
+        from webdriver_manager.chrome import ChromeDriverManager
         
         # --- ADD THIS TO DEBUG SCRIPT EXECUTION ---
         print("Script started. If you see this, the script is running.")
@@ -1226,23 +1452,11 @@ if __name__ == "__main__":
     except ImportError as e:
         print(f"Missing module: {e.name if hasattr(e, 'name') else str(e)}.")
         print("Please activate your virtual environment and install dependencies with:")
-        print("  pip install websocket-client requests beautifulsoup4 selenium webdriver-manager")
-        # Fix the requirements.txt path
-        req_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../requirements.txt"))
-        print(f"  pip install -r {req_path}")
-        
-        # Try to auto-install if possible
-        try:
-            print("\nAttempting to auto-install dependencies...")
-            install_missing_packages()
-            print("Dependencies installed. Please run the script again.")
-        except Exception as install_error:
-            print(f"Auto-installation failed: {install_error}")
-            print("Please install dependencies manually.")
-        
+        print(f"  pip install -r {REQUIREMENTS_PATH}")
+        print("or re-run with --bootstrap to install them automatically.")
         sys.exit(1)
     except Exception as e:
         print(f"An error occurred: {e}")
         import traceback
         traceback.print_exc()
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)